@@ -0,0 +1,237 @@
+"""
+In-memory stand-in for Supabase's PostgREST API.
+
+Serves the subset of `/rest/v1` that `SupabaseService` uses: inserts and
+upserts (`on_conflict`), and selects with `eq`, `in` and `gt` filters,
+`order` and `limit`. Rows live in dicts for the life of the server, so
+`SupabaseService` can be exercised end to end without a network or a
+database. As in Postgres, a plain insert that repeats an `id` or a table's
+unique column is rejected with a 409, and an upsert that repeats an
+`on_conflict` key within one request with a 400 (21000); either way none of
+its rows are written.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from config.constants import JOB_VECTORS_TABLE, JOBS_CONFLICT_KEY, JOBS_TABLE
+
+# supabase-py only checks that the key looks like a JWT
+STUB_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.c3R1Yg"
+
+_PREFIX = "/rest/v1/"
+# Query parameters that are not column filters
+_RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+# Unique column of each table besides `id`, as in the Supabase schema
+UNIQUE_COLUMNS = {JOBS_TABLE: JOBS_CONFLICT_KEY, JOB_VECTORS_TABLE: "job_id"}
+
+
+def _in_values(value: str) -> List[str]:
+    """Values of an `in.(a,"b,c")` filter."""
+    values, current, quoted = [], [], False
+    for char in value[1:-1]:
+        if char == '"':
+            quoted = not quoted
+        elif char == "," and not quoted:
+            values.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if current or values:
+        values.append("".join(current))
+    return values
+
+
+def _filter(params: List[Tuple[str, str]]) -> Callable[[Dict], bool]:
+    """Predicate for the `eq`, `in` and `gt` filters in `params`."""
+    conditions = []
+    for column, condition in params:
+        if column in _RESERVED:
+            continue
+        operator, _, value = condition.partition(".")
+        if operator == "in":
+            value = set(_in_values(value))
+        conditions.append((column, operator, value))
+
+    def matches(row: Dict) -> bool:
+        for column, operator, value in conditions:
+            cell = row.get(column)
+            cell = None if cell is None else str(cell)
+            if operator == "eq" and cell != value:
+                return False
+            if operator == "in" and cell not in value:
+                return False
+            if operator == "gt" and (cell is None or cell <= value):
+                return False
+        return True
+
+    return matches
+
+
+class PostgrestStandIn:
+    """
+    Local PostgREST server. Use as a context manager; `url` is what
+    `SupabaseService` takes as the project URL, with `STUB_KEY` as the key.
+    """
+
+    def __init__(self, unique_columns: Optional[Dict[str, str]] = None):
+        self.unique_columns = (
+            UNIQUE_COLUMNS if unique_columns is None else unique_columns
+        )
+        self.tables: Dict[str, Dict[str, Dict]] = {}
+        # Per table, rows by their unique column
+        self.unique: Dict[str, Dict[Any, Dict]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self) -> "PostgrestStandIn":
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; don't delay the body
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stand_in._handle(self)
+
+            def do_POST(self):
+                stand_in._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        parts = urlsplit(request.path)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        table = parts.path[len(_PREFIX) :] if parts.path.startswith(_PREFIX) else ""
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+
+        with self._lock:
+            if not table:
+                status, data = 404, {"message": "Not found"}
+            elif request.command == "POST":
+                status, data = self._write(table, json.loads(body or b"[]"), params)
+            else:
+                status, data = 200, self._read(table, params)
+
+        payload = json.dumps(data, default=str).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(payload)))
+        request.end_headers()
+        request.wfile.write(payload)
+
+    def _write(
+        self, table: str, rows: Any, params: List[Tuple[str, str]]
+    ) -> Tuple[int, Any]:
+        rows = [dict(row) for row in (rows if isinstance(rows, list) else [rows])]
+        on_conflict = dict(params).get("on_conflict")
+        stored = self.tables.setdefault(table, {})
+        unique_column = self.unique_columns.get(table)
+        unique = self.unique.setdefault(table, {})
+        if not on_conflict:
+            duplicate = self._duplicate(table, rows)
+            if duplicate:
+                column, value = duplicate
+                return 409, {
+                    "code": "23505",
+                    "message": "duplicate key value violates unique constraint "
+                    f'"{table}_{column}_key"',
+                    "details": f"Key ({column})=({value}) already exists.",
+                    "hint": None,
+                }
+        elif self._repeats(rows, on_conflict):
+            return 400, {
+                "code": "21000",
+                "message": "ON CONFLICT DO UPDATE command cannot affect row a "
+                "second time",
+                "details": None,
+                "hint": "Ensure that no rows proposed for insertion within the "
+                "same command have duplicate constrained values.",
+            }
+
+        by_key = {}
+        if on_conflict == unique_column:
+            by_key = unique
+        elif on_conflict:
+            by_key = {old.get(on_conflict): old for old in stored.values()}
+        written = []
+        for row in rows:
+            existing = by_key.get(row.get(on_conflict)) if on_conflict else None
+            if existing is not None:
+                existing.update(row)
+                written.append(existing)
+                continue
+            if "id" not in row:
+                self._next_id += 1
+                row["id"] = f"{self._next_id:08d}"
+            stored[row["id"]] = row
+            if on_conflict:
+                by_key[row.get(on_conflict)] = row
+            if unique_column:
+                unique[row.get(unique_column)] = row
+            written.append(row)
+        return 201, written
+
+    def _duplicate(self, table: str, rows: List[Dict]) -> Optional[Tuple[str, Any]]:
+        """The first `id` or unique value `rows` would repeat, if any."""
+        indexes = [("id", self.tables[table])]
+        if table in self.unique_columns:
+            indexes.append((self.unique_columns[table], self.unique[table]))
+        for column, index in indexes:
+            values = set()
+            for row in rows:
+                value = row.get(column)
+                if value is None:
+                    continue
+                if value in index or value in values:
+                    return column, value
+                values.add(value)
+        return None
+
+    @staticmethod
+    def _repeats(rows: List[Dict], on_conflict: str) -> bool:
+        """Whether two of `rows` share a (non-NULL) `on_conflict` key."""
+        columns = on_conflict.split(",")
+        keys = set()
+        for row in rows:
+            key = tuple(row.get(column) for column in columns)
+            if None in key:
+                continue
+            if key in keys:
+                return True
+            keys.add(key)
+        return False
+
+    def _read(self, table: str, params: List[Tuple[str, str]]) -> List[Dict]:
+        options = dict(params)
+        matches = _filter(params)
+        rows = [row for row in self.tables.get(table, {}).values() if matches(row)]
+        if "order" in options:
+            column, _, direction = options["order"].partition(".")
+            rows.sort(key=lambda row: str(row.get(column)), reverse=direction == "desc")
+        if "limit" in options:
+            rows = rows[: int(options["limit"])]
+        columns = options.get("select", "*").split(",")
+        if "*" in columns:
+            return rows
+        return [{column: row.get(column) for column in columns} for row in rows]
@@ -0,0 +1,469 @@
+"""
+Offline benchmark suite for the parse, extract and match hot paths.
+
+Times PDF reading, HTML extraction, LLM response handling, the extraction
+framework around a stubbed LLM, Supabase calls against a local PostgREST
+stand-in, job matching and metrics spans. Everything runs from the fixtures in
+`fixtures/` and synthetic data: no network access, API keys or database
+are needed. Logging is disabled while timing, so log output is not counted.
+
+Results are written as JSON: one entry per benchmark with the per-call
+min, median, mean and standard deviation in seconds, plus the environment
+they were measured in. Pass a previous run as `--baseline` to report each
+benchmark's change and exit with status 1 if any median regressed by more
+than `--threshold`.
+
+Steps:
+- run `python -m bestintern.benchmarks.run --output benchmarks.json`
+- optionally name benchmark prefixes to run only those, e.g. `pdf web`
+- compare a later run with `--baseline benchmarks.json`
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from functools import cached_property
+from io import BytesIO
+from itertools import count
+from timeit import Timer
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import PyPDF2
+
+from bestintern.benchmarks.postgrest import STUB_KEY, PostgrestStandIn
+from bestintern.core.core import JobMatcher
+from bestintern.database.supa import SupabaseService
+from bestintern.tools.llm.llm import LiteLLMModels, LiteLLMResponse
+from bestintern.tools.llm.modeler import LLMDataExtractor
+from bestintern.tools.pdf.reader import PDFReader
+from bestintern.tools.web.jsonld import find_job_posting, job_posting_fields
+from bestintern.tools.web.reader import WebpageReader
+from bestintern.utils import metrics
+from bestintern.utils.utils import clean_json_structure, parse_llm_response
+from config.constants import JOBS_CONFLICT_KEY
+from config.models import JobMetadata, ResumeMetadata
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCHMARK_DIR, "fixtures")
+SAMPLE_PDF = os.path.join(BENCHMARK_DIR, "../tools/pdf/example/sample_resume.pdf")
+
+# Tags JobParser collects while loading a page
+METADATA_TAGS = ["meta", "h1", "h2", "p"]
+LARGE_PDF_PAGES = 40
+NUM_JOBS = 500
+NUM_VECTORS = 500
+NUM_MATCH_JOBS = 20_000
+VECTOR_DIM = 768
+
+# name -> setup(context), returning the function to time
+BENCHMARKS: Dict[str, Callable[["Context"], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def read_fixture(name: str, mode: str = "r"):
+    with open(os.path.join(FIXTURE_DIR, name), mode) as file:
+        return file.read()
+
+
+class StubLLM:
+    """Stands in for `LiteLLM`, answering every prompt with a fixed response."""
+
+    def __init__(self, model: str, content: str):
+        self.model = model
+        self.content = content
+
+    def askllm(self, query: str, overwrite_system_prompt: str = None):
+        return LiteLLMResponse(content=self.content)
+
+    async def askllm_async(self, query: str, overwrite_system_prompt: str = None):
+        return LiteLLMResponse(content=self.content)
+
+
+class Context:
+    """
+    Inputs shared between benchmarks, built on first use. Stores are not
+    shared: each benchmark gets its own, closed by `release` once it ran.
+    """
+
+    def __init__(self):
+        self.rng = np.random.default_rng(0)
+        self.stack = ExitStack()
+        self._supabase: Optional[SupabaseService] = None
+
+    def release(self) -> None:
+        """Close the stores the last benchmark opened."""
+        self.stack.close()
+        self._supabase = None
+
+    @cached_property
+    def small_pdf(self) -> bytes:
+        with open(SAMPLE_PDF, "rb") as file:
+            return file.read()
+
+    @cached_property
+    def large_pdf(self) -> bytes:
+        """The sample resume's pages repeated into a long document."""
+        source = PyPDF2.PdfReader(BytesIO(self.small_pdf))
+        writer = PyPDF2.PdfWriter()
+        for _ in range(LARGE_PDF_PAGES // len(source.pages)):
+            for page in source.pages:
+                writer.add_page(page)
+        buffer = BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    @cached_property
+    def job_page(self) -> WebpageReader:
+        reader = WebpageReader("https://acme.example/jobs/4012345")
+        reader.load_html(read_fixture("job_posting.html", "rb"))
+        return reader
+
+    @cached_property
+    def job_known_fields(self) -> Dict[str, Any]:
+        return job_posting_fields(find_job_posting(self.job_page.json_ld))
+
+    @cached_property
+    def resume_text(self) -> str:
+        return PDFReader(self.small_pdf).get_full_text()
+
+    @property
+    def supabase(self) -> SupabaseService:
+        """A service over an empty PostgREST stand-in, one per benchmark."""
+        if self._supabase is None:
+            stand_in = self.stack.enter_context(PostgrestStandIn())
+            self._supabase = SupabaseService(stand_in.url, STUB_KEY)
+        return self._supabase
+
+    def jobs(self, count: int) -> List[Dict]:
+        """Distinct job rows, as upload builds them from extractions."""
+        job = parse_llm_response(read_fixture("llm_job_response.txt"))
+        return [
+            {**job, JOBS_CONFLICT_KEY: f"https://acme.example/jobs/{i}"}
+            for i in range(count)
+        ]
+
+    def vectors(self, count: int) -> np.ndarray:
+        return self.rng.standard_normal((count, VECTOR_DIM), dtype=np.float32)
+
+
+# PDF reading
+
+
+@benchmark("pdf.open.small")
+def pdf_open_small(context: Context):
+    return lambda: PDFReader(context.small_pdf)
+
+
+@benchmark("pdf.open.large")
+def pdf_open_large(context: Context):
+    return lambda: PDFReader(context.large_pdf)
+
+
+@benchmark("pdf.extract_metadata.small")
+def pdf_metadata_small(context: Context):
+    return lambda: PDFReader(context.small_pdf).extract_metadata()
+
+
+@benchmark("pdf.extract_metadata.large")
+def pdf_metadata_large(context: Context):
+    return lambda: PDFReader(context.large_pdf).extract_metadata()
+
+
+# Web pages
+
+
+def _load_page(html: bytes):
+    def load():
+        reader = WebpageReader("https://acme.example/jobs", metadata_tags=METADATA_TAGS)
+        reader.load_html(html)
+        return reader.extract_metadata(METADATA_TAGS)
+
+    return load
+
+
+@benchmark("web.load_html.posting")
+def web_posting(context: Context):
+    return _load_page(read_fixture("job_posting.html", "rb"))
+
+
+@benchmark("web.load_html.board")
+def web_board(context: Context):
+    return _load_page(read_fixture("job_board.html", "rb"))
+
+
+# LLM response handling
+
+
+@benchmark("utils.clean_json_structure.job")
+def clean_job_schema(context: Context):
+    schema = JobMetadata.model_json_schema()
+    return lambda: clean_json_structure(schema)
+
+
+@benchmark("utils.clean_json_structure.resume")
+def clean_resume_schema(context: Context):
+    schema = ResumeMetadata.model_json_schema()
+    return lambda: clean_json_structure(schema)
+
+
+@benchmark("utils.parse_llm_response.job")
+def parse_job_response(context: Context):
+    response = read_fixture("llm_job_response.txt")
+    return lambda: parse_llm_response(response)
+
+
+@benchmark("utils.parse_llm_response.resume")
+def parse_resume_response(context: Context):
+    response = read_fixture("llm_resume_response.txt")
+    return lambda: parse_llm_response(response)
+
+
+# Extraction around a stubbed LLM: prompt rendering, parsing and validation
+
+
+def _stub_extractor(response_fixture: str) -> LLMDataExtractor:
+    extractor = LLMDataExtractor(model=LiteLLMModels.gemini_flash)
+    extractor.llm = StubLLM(extractor.llm.model, read_fixture(response_fixture))
+    return extractor
+
+
+@benchmark("llm.extract_data.job")
+def extract_job(context: Context):
+    extractor = _stub_extractor("llm_job_response.txt")
+    return lambda: extractor.extract_data(context.job_page.text, JobMetadata)
+
+
+@benchmark("llm.extract_data.job_known_fields")
+def extract_job_known(context: Context):
+    extractor = _stub_extractor("llm_job_response.txt")
+    return lambda: extractor.extract_data(
+        context.job_page.text, JobMetadata, known_fields=context.job_known_fields
+    )
+
+
+@benchmark("llm.extract_data.resume")
+def extract_resume(context: Context):
+    extractor = _stub_extractor("llm_resume_response.txt")
+    return lambda: extractor.extract_data(context.resume_text, ResumeMetadata)
+
+
+# Supabase, against the local PostgREST stand-in
+
+
+@benchmark("supabase.insert_job")
+def supabase_insert(context: Context):
+    job = context.jobs(1)[0]
+    # A new URL per call, as the same one would be rejected as a duplicate
+    urls = (f"https://acme.example/jobs/new-{i}" for i in count())
+    return lambda: context.supabase.insert_job({**job, JOBS_CONFLICT_KEY: next(urls)})
+
+
+@benchmark(f"supabase.upsert_jobs.{NUM_JOBS}")
+def supabase_upsert(context: Context):
+    jobs = context.jobs(NUM_JOBS)
+    return lambda: context.supabase.upsert_jobs(jobs)
+
+
+@benchmark(f"supabase.get_jobs_by_ids.{NUM_JOBS}")
+def supabase_get_jobs(context: Context):
+    rows = context.supabase.upsert_jobs(context.jobs(NUM_JOBS))
+    job_ids = [row.data["id"] for row in rows]
+    return lambda: context.supabase.get_jobs_by_ids(job_ids)
+
+
+@benchmark(f"supabase.iter_job_vectors.{NUM_VECTORS}")
+def supabase_iter_vectors(context: Context):
+    context.supabase.upsert_job_vectors(
+        [
+            # pgvector columns come back as text, e.g. "[0.1,0.2]"
+            {"job_id": f"job-{i:05d}", "vector": json.dumps(vector.tolist())}
+            for i, vector in enumerate(context.vectors(NUM_VECTORS))
+        ]
+    )
+    return lambda: list(context.supabase.iter_job_vectors(page_size=100))
+
+
+# Instrumentation, which is off unless enabled
+
+
+@benchmark("metrics.span.disabled")
+def span_disabled(context: Context):
+    def timed():
+        with metrics.span("benchmark"):
+            pass
+
+    return timed
+
+
+@benchmark("metrics.span.enabled")
+def span_enabled(context: Context):
+    metrics.enable()
+    return span_disabled(context)
+
+
+# Matching
+
+
+@benchmark(f"match.top_k.{NUM_MATCH_JOBS}")
+def match_top_k(context: Context):
+    matcher = JobMatcher(
+        [f"job-{i}" for i in range(NUM_MATCH_JOBS)], context.vectors(NUM_MATCH_JOBS)
+    )
+    resume = context.vectors(1)[0]
+    return lambda: matcher.top_k(resume, k=10)
+
+
+@benchmark(f"match.top_k_batch.{NUM_MATCH_JOBS}")
+def match_top_k_batch(context: Context):
+    matcher = JobMatcher(
+        [f"job-{i}" for i in range(NUM_MATCH_JOBS)], context.vectors(NUM_MATCH_JOBS)
+    )
+    resumes = context.vectors(32)
+    return lambda: matcher.top_k_batch(resumes, k=10)
+
+
+def measure(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Per-call timings over `repeat` rounds of enough calls to fill 0.2 s."""
+    function()  # warm caches, as in steady-state use
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "stdev_s": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=BENCHMARK_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Annotate `results` with their change from `baseline` and return the
+    names of those whose median grew by more than `threshold`.
+    """
+    previous = {result["name"]: result for result in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if not before:
+            continue
+        change = result["median_s"] / before["median_s"] - 1
+        result["baseline_median_s"] = before["median_s"]
+        result["change"] = change
+        if change > threshold:
+            regressions.append(result["name"])
+    return regressions
+
+
+def run(prefixes: List[str], repeat: int) -> List[Dict[str, Any]]:
+    names = [
+        name
+        for name in BENCHMARKS
+        if not prefixes or any(name.startswith(prefix) for prefix in prefixes)
+    ]
+    results = []
+    context = Context()
+    for name in names:
+        try:
+            function = BENCHMARKS[name](context)
+            result = {"name": name, **measure(function, repeat)}
+        finally:
+            metrics.disable()
+            metrics.reset()
+            context.release()
+        results.append(result)
+        print(
+            f"{name:<40} {result['median_s'] * 1e3:>10.3f} ms "
+            f"(min {result['min_s'] * 1e3:.3f} ms, n={result['number']})",
+            file=sys.stderr,
+        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "prefixes", nargs="*", help="run only benchmarks starting with these"
+    )
+    parser.add_argument("--output", help="write JSON results here, not stdout")
+    parser.add_argument("--baseline", help="JSON results of a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="median slowdown counted as a regression (default 0.2, i.e. 20%%)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per benchmark")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    try:
+        results = run(args.prefixes, args.repeat)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    report: Dict[str, Any] = {"environment": environment(), "results": results}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        report["baseline"] = baseline.get("environment")
+        report["regressions"] = compare(results, baseline, args.threshold)
+        for name in report["regressions"]:
+            print(f"regression: {name}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""Approximate nearest-neighbor index over job vectors, shared through mmap."""
+
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from bestintern.core.core import JobMatch, Vector, normalize_rows, parse_vector
+from bestintern.utils.logger import setup_logger
+from config.constants import ANN_KMEANS_ITERATIONS, ANN_NPROBE
+
+logger = setup_logger(__name__)
+
+# Rows scored against the centroids at once while assigning vectors to lists
+_ASSIGN_CHUNK = 65_536
+# Training samples per list used to fit the centroids
+_SAMPLES_PER_LIST = 40
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the nearest (highest cosine) centroid of every vector."""
+    lists = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        chunk = vectors[start : start + _ASSIGN_CHUNK]
+        lists[start : start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return lists
+
+
+def _train_centroids(
+    vectors: np.ndarray, nlist: int, iterations: int, seed: int
+) -> np.ndarray:
+    """Spherical k-means on a sample of the (normalized) vectors."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * _SAMPLES_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        lists = _assign(sample, centroids)
+        order = np.argsort(lists, kind="stable")
+        counts = np.bincount(lists, minlength=nlist)
+        used = counts > 0
+        sums = np.zeros_like(centroids)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums[used] = np.add.reduceat(sample[order], starts[used], axis=0)
+        empty = ~used
+        # Re-seed empty lists from random samples so every list gets used
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Inverted-file index: job vectors are bucketed by their nearest centroid and
+    a query only scores the `nprobe` buckets closest to it.
+
+    `nprobe` is the recall/latency knob: probing more lists finds more of the
+    true nearest jobs but scores more vectors. Saved indexes are directories of
+    `.npy` files that `load` memory-maps, so every worker process shares the
+    same pages from the OS cache instead of holding its own copy.
+
+    Inserts go to a small in-memory segment that is searched exhaustively and
+    deletes are masked out; `save` folds both into the bucketed layout. Both
+    find a job's row through a job id map, built on the first insert or
+    delete, so they cost O(1) each however large the index is.
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        vectors: np.ndarray,
+        job_ids: np.ndarray,
+        offsets: np.ndarray,
+        nprobe: int = ANN_NPROBE,
+    ):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.job_ids = job_ids
+        self.offsets = offsets
+        self.nprobe = nprobe
+        self.alive = np.ones(len(job_ids), dtype=bool)
+        # Inserted jobs not yet folded in by `save`, in insertion order
+        self.new_vectors: Dict[str, np.ndarray] = {}
+        self._rows: Optional[Dict[str, int]] = None
+        self._new_matrix: Optional[np.ndarray] = None
+
+    @property
+    def dim(self) -> int:
+        return self.centroids.shape[1]
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        return int(self.alive.sum()) + len(self.new_vectors)
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        """Row of each job id in the bucketed arrays."""
+        if self._rows is None:
+            self._rows = {str(job_id): row for row, job_id in enumerate(self.job_ids)}
+        return self._rows
+
+    @classmethod
+    def build(
+        cls,
+        job_ids: List[str],
+        vectors: Vector,
+        nlist: Optional[int] = None,
+        iterations: int = ANN_KMEANS_ITERATIONS,
+        seed: int = 0,
+        nprobe: int = ANN_NPROBE,
+    ) -> "IVFIndex":
+        """Cluster `vectors` into `nlist` lists (default ~4 * sqrt(n))."""
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        if nlist is None:
+            nlist = max(1, int(4 * np.sqrt(len(vectors))))
+        nlist = min(nlist, len(vectors))
+
+        centroids = _train_centroids(vectors, nlist, iterations, seed)
+        return cls._from_assignment(
+            centroids,
+            vectors,
+            np.asarray(job_ids, dtype=str),
+            _assign(vectors, centroids),
+            nprobe,
+        )
+
+    @classmethod
+    def from_job_vectors(cls, rows: Iterable[Dict], **kwargs) -> "IVFIndex":
+        """Build an index from job_vectors rows (`job_id` and `vector`)."""
+        job_ids = []
+        vectors = []
+        for row in rows:
+            job_ids.append(row["job_id"])
+            vectors.append(parse_vector(row["vector"]))
+        return cls.build(job_ids, vectors, **kwargs)
+
+    @classmethod
+    def _from_assignment(
+        cls,
+        centroids: np.ndarray,
+        vectors: np.ndarray,
+        job_ids: np.ndarray,
+        lists: np.ndarray,
+        nprobe: int,
+    ) -> "IVFIndex":
+        order = np.argsort(lists, kind="stable")
+        counts = np.bincount(lists, minlength=len(centroids))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(
+            centroids,
+            np.ascontiguousarray(vectors[order]),
+            job_ids[order],
+            offsets,
+            nprobe=nprobe,
+        )
+
+    def insert(self, job_id: str, vector: Vector) -> None:
+        """Add a job, replacing any vector it already has; searchable at once."""
+        vector = normalize_rows(np.asarray(vector, dtype=np.float32))
+        if vector.shape != (self.dim,):
+            raise ValueError(f"Expected a vector of dimension {self.dim}")
+        self.delete([job_id])
+        self.new_vectors[job_id] = vector
+        self._new_matrix = None
+
+    def delete(self, job_ids: Iterable[str]) -> None:
+        """Remove jobs, e.g. once their postings expire."""
+        for job_id in job_ids:
+            row = self.rows.get(job_id)
+            if row is not None:
+                self.alive[row] = False
+            if self.new_vectors.pop(job_id, None) is not None:
+                self._new_matrix = None
+
+    def search(
+        self, query: Vector, k: int = 10, nprobe: Optional[int] = None
+    ) -> List[JobMatch]:
+        """Return about the `k` most similar jobs, probing `nprobe` lists."""
+        query = normalize_rows(np.asarray(query, dtype=np.float32))
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+
+        probed = np.argpartition(self.centroids @ query, -nprobe)[-nprobe:]
+        rows = np.concatenate(
+            [np.arange(self.offsets[i], self.offsets[i + 1]) for i in probed]
+        )
+        rows = rows[self.alive[rows]]
+
+        scores = self.vectors[rows] @ query
+        job_ids = self.job_ids[rows]
+        if self.new_vectors:
+            if self._new_matrix is None:
+                self._new_matrix = np.stack(list(self.new_vectors.values()))
+            scores = np.concatenate([scores, self._new_matrix @ query])
+            job_ids = np.concatenate(
+                [job_ids, np.asarray(list(self.new_vectors), dtype=str)]
+            )
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(scores, -k)[-k:]
+        best = best[np.argsort(scores[best])[::-1]]
+        return [
+            JobMatch(job_id=str(job_ids[index]), score=float(scores[index]))
+            for index in best
+        ]
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to `path`, folding in inserts and deletes.
+
+        `path` is a symlink to a versioned directory beside it. Each save
+        writes a new version and atomically repoints the link, so a `load`
+        sees either the old index or the new one, never a mix. The version
+        it replaces is kept until the next save, for processes still loading
+        or memory-mapping it; older ones are removed.
+        """
+        vectors = self.vectors[self.alive]
+        job_ids = self.job_ids[self.alive]
+        lists = np.repeat(np.arange(self.nlist), np.diff(self.offsets))[self.alive]
+        if self.new_vectors:
+            new_vectors = np.stack(list(self.new_vectors.values()))
+            vectors = np.concatenate([vectors, new_vectors])
+            job_ids = np.concatenate(
+                [job_ids, np.asarray(list(self.new_vectors), dtype=str)]
+            )
+            lists = np.concatenate([lists, _assign(new_vectors, self.centroids)])
+        compacted = self._from_assignment(
+            self.centroids, vectors, job_ids, lists, self.nprobe
+        )
+
+        path = os.path.abspath(path)
+        parent, name = os.path.split(path)
+        os.makedirs(parent, exist_ok=True)
+        prefix = f"{name}.v-"
+        version_path = tempfile.mkdtemp(dir=parent, prefix=prefix)
+        # mkdtemp makes it private; other users' workers must read it too
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(version_path, 0o777 & ~umask)
+        np.save(os.path.join(version_path, "centroids.npy"), compacted.centroids)
+        np.save(os.path.join(version_path, "vectors.npy"), compacted.vectors)
+        np.save(os.path.join(version_path, "job_ids.npy"), compacted.job_ids)
+        np.save(os.path.join(version_path, "offsets.npy"), compacted.offsets)
+        with open(os.path.join(version_path, "meta.json"), "w") as file:
+            json.dump({"nprobe": self.nprobe, "size": len(compacted)}, file)
+
+        keep = {os.path.basename(version_path)}
+        if os.path.isdir(path) and not os.path.islink(path):
+            # An index saved as a plain directory becomes the previous version
+            previous_path = tempfile.mkdtemp(dir=parent, prefix=prefix)
+            os.replace(path, previous_path)
+            keep.add(os.path.basename(previous_path))
+        elif os.path.islink(path):
+            # Links are relative, so they point at entries of `parent`
+            keep.add(os.path.basename(os.readlink(path)))
+        link_path = f"{version_path}.link"
+        os.symlink(os.path.basename(version_path), link_path)
+        os.replace(link_path, path)
+
+        for entry in os.listdir(parent):
+            if entry.startswith(prefix) and entry not in keep:
+                shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
+        logger.info("Saved IVF index with %d jobs to %s", len(compacted), path)
+
+    @classmethod
+    def load(cls, path: str, nprobe: Optional[int] = None) -> "IVFIndex":
+        """Memory-map a saved index; vectors are paged in only when probed."""
+        # Resolved once, so a concurrent save cannot swap versions mid-load
+        path = os.path.realpath(path)
+        with open(os.path.join(path, "meta.json"), "r") as file:
+            meta = json.load(file)
+        return cls(
+            np.load(os.path.join(path, "centroids.npy")),
+            np.load(os.path.join(path, "vectors.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "job_ids.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "offsets.npy")),
+            nprobe=nprobe or meta["nprobe"],
+        )
@@ -1,3 +1,82 @@
-# input resume
+"""Match a resume to the jobs that fit it best."""
 
-# output top x jobs, and why
+import json
+from typing import Dict, Iterable, List, Sequence, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+Vector = Union[Sequence[float], np.ndarray]
+
+
+class JobMatch(BaseModel):
+    job_id: str
+    score: float
+
+
+def parse_vector(vector: Union[str, Vector]) -> List[float]:
+    """Read a vector as stored in job_vectors (pgvector returns it as a string)."""
+    if isinstance(vector, str):
+        return json.loads(vector)
+    return vector
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length so dot products are cosine similarities."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+class JobMatcher:
+    """
+    Scores resume embeddings against every job vector held in memory.
+
+    Job vectors live in one contiguous, row-normalized float32 matrix, so a
+    resume is scored against all jobs with a single matrix-vector product
+    and the best `k` are picked with `argpartition` instead of a full sort.
+    """
+
+    def __init__(self, job_ids: List[str], vectors: np.ndarray):
+        if len(job_ids) != len(vectors):
+            raise ValueError("Expected one vector per job id")
+        self.job_ids = list(job_ids)
+        self.matrix = np.ascontiguousarray(
+            normalize_rows(np.asarray(vectors, dtype=np.float32))
+        )
+
+    @classmethod
+    def from_job_vectors(cls, rows: Iterable[Dict]) -> "JobMatcher":
+        """Build a matcher from job_vectors rows (`job_id` and `vector`)."""
+        job_ids = []
+        vectors = []
+        for row in rows:
+            job_ids.append(row["job_id"])
+            vectors.append(parse_vector(row["vector"]))
+        return cls(job_ids, np.asarray(vectors, dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def top_k(self, resume_vector: Vector, k: int = 10) -> List[JobMatch]:
+        """Return the `k` jobs most similar to one resume embedding."""
+        query = normalize_rows(np.asarray(resume_vector, dtype=np.float32))
+        scores = self.matrix @ query
+        return self._best(scores, k)
+
+    def top_k_batch(self, resume_vectors: Vector, k: int = 10) -> List[List[JobMatch]]:
+        """Return the `k` best jobs for each resume embedding (one per row)."""
+        queries = normalize_rows(np.asarray(resume_vectors, dtype=np.float32))
+        scores = queries @ self.matrix.T
+        return [self._best(row, k) for row in scores]
+
+    def _best(self, scores: np.ndarray, k: int) -> List[JobMatch]:
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(scores, -k)[-k:]
+        best = best[np.argsort(scores[best])[::-1]]
+        return [
+            JobMatch(job_id=str(self.job_ids[index]), score=float(scores[index]))
+            for index in best
+        ]
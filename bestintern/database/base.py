@@ -0,0 +1,69 @@
+"""Storage interface shared by the Supabase and local backends."""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+
+from pydantic import BaseModel
+
+from bestintern.utils.logger import setup_logger
+from config.constants import READ_PAGE_SIZE
+
+logger = setup_logger(__name__)
+
+
+class RowResult(BaseModel):
+    """Outcome of writing one row of a bulk insert or upsert."""
+
+    index: int
+    ok: bool
+    data: Optional[Dict] = None
+    error: Optional[str] = None
+
+
+class StorageBackend(ABC):
+    """
+    Jobs and job vectors, as read and written by the ingest and matching
+    services. Reads return None on failure, like the original Supabase client.
+    """
+
+    @abstractmethod
+    def insert_job(self, job_data: Dict) -> Optional[Dict]:
+        """Insert a job into the jobs table."""
+
+    @abstractmethod
+    def insert_job_vector(self, job_id: str, vector: List[float]) -> Optional[Dict]:
+        """Insert a job vector into the job_vectors table."""
+
+    @abstractmethod
+    def upsert_jobs(self, jobs: List[Dict]) -> List[RowResult]:
+        """Insert or replace jobs, keyed by their application URL."""
+
+    @abstractmethod
+    def upsert_job_vectors(self, rows: List[Dict]) -> List[RowResult]:
+        """Insert or replace job vectors, keyed by job_id."""
+
+    @abstractmethod
+    def get_job_vector_hashes(self, job_ids: List[str]) -> Optional[Dict[str, str]]:
+        """Fetch the content hash each job's vector was embedded from."""
+
+    @abstractmethod
+    def iter_job_vectors(
+        self,
+        columns: List[str] = ["job_id", "vector"],
+        page_size: int = READ_PAGE_SIZE,
+    ) -> Iterator[Dict]:
+        """Stream job vectors, fetching only `columns`."""
+
+    @abstractmethod
+    def get_jobs_by_ids(
+        self, job_ids: List[str], columns: List[str] = ["*"]
+    ) -> Optional[List[Dict]]:
+        """Fetch jobs by their IDs."""
+
+    def get_job_vectors(self) -> Optional[List[Dict]]:
+        """Fetch all job vectors."""
+        try:
+            return list(self.iter_job_vectors(columns=["*"]))
+        except Exception as e:
+            logger.exception("Exception occurred while fetching job vectors: %s", e)
+            return None
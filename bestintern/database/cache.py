@@ -0,0 +1,97 @@
+"""Read-through local replica in front of a remote storage backend."""
+
+import time
+from typing import Dict, Iterator, List, Optional
+
+from bestintern.database.base import RowResult, StorageBackend
+from bestintern.database.local import LocalStorage
+from bestintern.utils.logger import setup_logger
+from config.constants import JOB_VECTORS_TABLE, LOCAL_CACHE_MAX_AGE, READ_PAGE_SIZE
+
+logger = setup_logger(__name__)
+
+
+class CachedStorage(StorageBackend):
+    """
+    Serves reads from a `LocalStorage` replica and writes through to `remote`.
+
+    Jobs are fetched from `remote` only when missing locally. Job vectors are
+    copied over in bulk, and again once the copy is older than `max_age`
+    seconds, so matcher processes scan them from local disk. Successful
+    writes are mirrored locally; `remote` stays the source of truth.
+    """
+
+    def __init__(
+        self,
+        remote: StorageBackend,
+        local: Optional[LocalStorage] = None,
+        max_age: float = LOCAL_CACHE_MAX_AGE,
+    ):
+        self.remote = remote
+        self.local = local or LocalStorage()
+        self.max_age = max_age
+
+    def insert_job(self, job_data: Dict) -> Optional[Dict]:
+        job = self.remote.insert_job(job_data)
+        if job is not None:
+            self.local.upsert_jobs([job])
+        return job
+
+    def insert_job_vector(self, job_id: str, vector: List[float]) -> Optional[Dict]:
+        row = self.remote.insert_job_vector(job_id, vector)
+        if row is not None:
+            self.local.upsert_job_vectors([{"job_id": job_id, "vector": vector}])
+        return row
+
+    def upsert_jobs(self, jobs: List[Dict]) -> List[RowResult]:
+        results = self.remote.upsert_jobs(jobs)
+        self.local.upsert_jobs(
+            [result.data or jobs[result.index] for result in results if result.ok]
+        )
+        return results
+
+    def upsert_job_vectors(self, rows: List[Dict]) -> List[RowResult]:
+        results = self.remote.upsert_job_vectors(rows)
+        self.local.upsert_job_vectors(
+            [rows[result.index] for result in results if result.ok]
+        )
+        return results
+
+    def get_job_vector_hashes(self, job_ids: List[str]) -> Optional[Dict[str, str]]:
+        # Hashes decide what gets re-embedded, so ask the source of truth
+        return self.remote.get_job_vector_hashes(job_ids)
+
+    def get_jobs_by_ids(
+        self, job_ids: List[str], columns: List[str] = ["*"]
+    ) -> Optional[List[Dict]]:
+        jobs = self.local.get_jobs_by_ids(job_ids) or []
+        found = {str(job["id"]) for job in jobs}
+        missing = [job_id for job_id in job_ids if str(job_id) not in found]
+        if missing:
+            fetched = self.remote.get_jobs_by_ids(missing)
+            if fetched is None:
+                return None
+            self.local.upsert_jobs(fetched)
+            jobs.extend(fetched)
+            logger.info("Fetched %d of %d jobs from remote", len(missing), len(jobs))
+        if "*" in columns:
+            return jobs
+        return [{column: job.get(column) for column in columns} for job in jobs]
+
+    def iter_job_vectors(
+        self,
+        columns: List[str] = ["job_id", "vector"],
+        page_size: int = READ_PAGE_SIZE,
+    ) -> Iterator[Dict]:
+        synced_at = self.local.synced_at(JOB_VECTORS_TABLE)
+        if synced_at is None or time.time() - synced_at > self.max_age:
+            self.sync_job_vectors()
+        return self.local.iter_job_vectors(columns=columns, page_size=page_size)
+
+    def sync_job_vectors(self) -> int:
+        """Replace the local job vectors with a fresh copy of the remote ones."""
+        loaded = self.local.load_job_vectors(
+            self.remote.iter_job_vectors(columns=["job_id", "vector", "content_hash"])
+        )
+        self.local.mark_synced(JOB_VECTORS_TABLE)
+        return loaded
@@ -0,0 +1,297 @@
+"""SQLite storage backend, for offline runs and as a local replica of Supabase."""
+
+import json
+import sqlite3
+import time
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from bestintern.core.core import parse_vector
+from bestintern.database.base import RowResult, StorageBackend
+from bestintern.utils import sqlite
+from bestintern.utils.logger import setup_logger
+from config.constants import (
+    JOBS_CONFLICT_KEY,
+    LOCAL_STORAGE_PATH,
+    READ_PAGE_SIZE,
+    SQLITE_MAX_VARIABLES,
+)
+
+logger = setup_logger(__name__)
+
+_VECTORS_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS {table} ("
+    "job_id TEXT PRIMARY KEY, vector BLOB NOT NULL, content_hash TEXT)"
+)
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    "id TEXT PRIMARY KEY, application_url TEXT UNIQUE, data TEXT NOT NULL)",
+    _VECTORS_SCHEMA.format(table="job_vectors"),
+    "CREATE TABLE IF NOT EXISTS sync_state ("
+    "table_name TEXT PRIMARY KEY, synced_at REAL NOT NULL)",
+)
+
+
+def _encode_vector(vector) -> bytes:
+    return np.asarray(parse_vector(vector), dtype=np.float32).tobytes()
+
+
+def _project(row: Dict, columns: List[str]) -> Dict:
+    if "*" in columns:
+        return row
+    return {column: row.get(column) for column in columns}
+
+
+class LocalStorage(StorageBackend):
+    """
+    Jobs and job vectors in a single SQLite file.
+
+    Jobs are stored as JSON documents keyed by `id`, with a unique index on
+    the application URL for upserts. Vectors are stored as float32 blobs and
+    come back as NumPy arrays, so a matcher loads them without JSON parsing.
+    Bulk writes run as one transaction of `executemany` statements.
+    """
+
+    def __init__(self, path: str = LOCAL_STORAGE_PATH):
+        self.path = path
+        sqlite.create(path, _SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite.connect(self.path, synchronous="NORMAL")
+
+    # Jobs
+    @staticmethod
+    def _job_row(job: Dict) -> tuple:
+        job = {**job, "id": job.get("id") or str(uuid.uuid4())}
+        return (
+            str(job["id"]),
+            job.get(JOBS_CONFLICT_KEY),
+            json.dumps(job, default=str),
+        )
+
+    def insert_job(self, job_data: Dict) -> Optional[Dict]:
+        """Insert a job into the jobs table."""
+        row = self._job_row(job_data)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO jobs (id, application_url, data) VALUES (?, ?, ?)",
+                    row,
+                )
+        except sqlite3.Error as e:
+            logger.exception("Exception occurred while inserting job: %s", e)
+            return None
+        return json.loads(row[2])
+
+    def upsert_jobs(self, jobs: List[Dict]) -> List[RowResult]:
+        """
+        Insert or replace jobs, keyed by their application URL. A job that
+        replaces an existing one keeps the existing id. A job whose id is
+        already stored under another URL (its posting moved) replaces that
+        row, URL included.
+        """
+        rows = [self._job_row(job) for job in jobs]
+        statement = (
+            "INSERT INTO jobs (id, application_url, data) VALUES (?, ?, ?) "
+            "ON CONFLICT (application_url) DO UPDATE SET data = "
+            "json_set(excluded.data, '$.id', jobs.id) "
+            "ON CONFLICT (id) DO UPDATE SET "
+            "application_url = excluded.application_url, data = excluded.data"
+        )
+        results = self._write_many(statement, rows)
+
+        # Report the id each job ended up with
+        urls = [row[1] for row in rows if row[1] is not None]
+        stored = {
+            job[JOBS_CONFLICT_KEY]: job
+            for job in self._select_jobs_in("application_url", urls)
+        }
+        for result, row in zip(results, rows):
+            if result.ok:
+                result.data = stored.get(row[1], json.loads(row[2]))
+        return results
+
+    def get_jobs_by_ids(
+        self, job_ids: List[str], columns: List[str] = ["*"]
+    ) -> Optional[List[Dict]]:
+        """Fetch jobs by their IDs."""
+        try:
+            jobs = self._select_jobs_in("id", [str(job_id) for job_id in job_ids])
+        except sqlite3.Error as e:
+            logger.exception("Exception occurred while fetching jobs: %s", e)
+            return None
+        return [_project(job, columns) for job in jobs]
+
+    def _select_jobs_in(self, column: str, values: List[str]) -> List[Dict]:
+        jobs = []
+        with self._connect() as conn:
+            for start in range(0, len(values), SQLITE_MAX_VARIABLES):
+                chunk = values[start : start + SQLITE_MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                jobs.extend(
+                    json.loads(data)
+                    for (data,) in conn.execute(
+                        f"SELECT data FROM jobs WHERE {column} IN ({placeholders})",
+                        chunk,
+                    )
+                )
+        return jobs
+
+    # Job vectors
+    @staticmethod
+    def _vector_row(row: Dict) -> tuple:
+        return (
+            str(row["job_id"]),
+            _encode_vector(row["vector"]),
+            row.get("content_hash"),
+        )
+
+    def insert_job_vector(self, job_id: str, vector: List[float]) -> Optional[Dict]:
+        """Insert a job vector into the job_vectors table."""
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO job_vectors (job_id, vector) VALUES (?, ?)",
+                    (str(job_id), _encode_vector(vector)),
+                )
+        except sqlite3.Error as e:
+            logger.exception("Exception occurred while inserting job vector: %s", e)
+            return None
+        return {"job_id": job_id, "vector": vector}
+
+    def upsert_job_vectors(self, rows: List[Dict]) -> List[RowResult]:
+        """Insert or replace job vectors, keyed by job_id."""
+        results = self._write_many(
+            "INSERT OR REPLACE INTO job_vectors (job_id, vector, content_hash) "
+            "VALUES (?, ?, ?)",
+            [self._vector_row(row) for row in rows],
+        )
+        for result, row in zip(results, rows):
+            if result.ok:
+                result.data = row
+        return results
+
+    def load_job_vectors(self, rows: Iterable[Dict], batch_size: int = 10_000) -> int:
+        """
+        Replace every stored vector with `rows`. Returns the row count.
+
+        Rows are staged in a side table a batch per transaction, so reading
+        them (e.g. paging through Supabase) never holds the write lock. The
+        staged table then replaces the old one in a single short transaction,
+        and readers see either the old or the new set.
+        """
+        with self._connect() as conn:
+            conn.execute("DROP TABLE IF EXISTS job_vectors_loading")
+            conn.execute(_VECTORS_SCHEMA.format(table="job_vectors_loading"))
+
+        loaded = 0
+        batch = []
+        for row in rows:
+            batch.append(self._vector_row(row))
+            if len(batch) >= batch_size:
+                loaded += self._stage_job_vectors(batch)
+                batch = []
+        loaded += self._stage_job_vectors(batch)
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DROP TABLE job_vectors")
+            conn.execute("ALTER TABLE job_vectors_loading RENAME TO job_vectors")
+        logger.info("Loaded %d job vectors into %s", loaded, self.path)
+        return loaded
+
+    def _stage_job_vectors(self, batch: List[tuple]) -> int:
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO job_vectors_loading VALUES (?, ?, ?)", batch
+            )
+        return len(batch)
+
+    def get_job_vector_hashes(self, job_ids: List[str]) -> Optional[Dict[str, str]]:
+        """Fetch the content hash each job's vector was embedded from."""
+        job_ids = [str(job_id) for job_id in job_ids]
+        hashes = {}
+        try:
+            with self._connect() as conn:
+                for start in range(0, len(job_ids), SQLITE_MAX_VARIABLES):
+                    chunk = job_ids[start : start + SQLITE_MAX_VARIABLES]
+                    placeholders = ",".join("?" * len(chunk))
+                    hashes.update(
+                        conn.execute(
+                            "SELECT job_id, content_hash FROM job_vectors "
+                            f"WHERE job_id IN ({placeholders})",
+                            chunk,
+                        )
+                    )
+        except sqlite3.Error as e:
+            logger.exception("Exception occurred while fetching hashes: %s", e)
+            return None
+        return hashes
+
+    def iter_job_vectors(
+        self,
+        columns: List[str] = ["job_id", "vector"],
+        page_size: int = READ_PAGE_SIZE,
+    ) -> Iterator[Dict]:
+        """Stream job vectors (as float32 arrays), fetching only `columns`."""
+        after = ""
+        while True:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT job_id, vector, content_hash FROM job_vectors "
+                    "WHERE job_id > ? ORDER BY job_id LIMIT ?",
+                    (after, page_size),
+                ).fetchall()
+            for job_id, vector, content_hash in rows:
+                row = {
+                    "job_id": job_id,
+                    "vector": np.frombuffer(vector, dtype=np.float32),
+                    "content_hash": content_hash,
+                }
+                yield _project(row, columns)
+            if len(rows) < page_size:
+                return
+            after = rows[-1][0]
+
+    # Sync bookkeeping for replicas
+    def synced_at(self, table_name: str) -> Optional[float]:
+        """When `table_name` was last copied from the remote store, if ever."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT synced_at FROM sync_state WHERE table_name = ?",
+                (table_name,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_synced(self, table_name: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?)",
+                (table_name, time.time()),
+            )
+
+    def _write_many(self, statement: str, rows: List[tuple]) -> List[RowResult]:
+        """
+        Run `statement` for every row in one transaction. If any row fails,
+        the batch is rolled back and retried row by row to report which.
+        """
+        try:
+            with self._connect() as conn:
+                conn.executemany(statement, rows)
+            return [RowResult(index=index, ok=True) for index in range(len(rows))]
+        except sqlite3.Error as e:
+            if len(rows) == 1:
+                return [RowResult(index=0, ok=False, error=str(e))]
+            logger.warning("Bulk write rejected, retrying row by row: %s", e)
+
+        results = []
+        with self._connect() as conn:
+            for index, row in enumerate(rows):
+                try:
+                    conn.execute(statement, row)
+                    results.append(RowResult(index=index, ok=True))
+                except sqlite3.Error as e:
+                    results.append(RowResult(index=index, ok=False, error=str(e)))
+        return results
@@ -1,14 +1,60 @@
-from typing import Dict, List, Optional, Union
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
+from postgrest.exceptions import APIError
 from supabase import Client, create_client
 
+from bestintern.database.base import RowResult, StorageBackend
 from bestintern.utils.logger import setup_logger
-from config.constants import JOB_VECTORS_TABLE, JOBS_TABLE
+from config.constants import (
+    BULK_MAX_BYTES,
+    BULK_MAX_CONCURRENCY,
+    BULK_MAX_ROWS,
+    JOB_VECTORS_TABLE,
+    JOBS_CONFLICT_KEY,
+    JOBS_TABLE,
+    READ_MAX_IDS,
+    READ_PAGE_SIZE,
+    ROW_ERROR_CODES,
+)
 
 logger = setup_logger(__name__)
 
 
-class SupabaseService:
+def _chunk_rows(
+    rows: List[Dict], max_rows: int, max_bytes: int
+) -> Iterator[List[Tuple[int, Dict]]]:
+    """Split rows into (index, row) chunks bounded by count and JSON size."""
+    chunk: List[Tuple[int, Dict]] = []
+    size = 0
+    for index, row in enumerate(rows):
+        row_size = len(json.dumps(row, default=str))
+        if chunk and (len(chunk) >= max_rows or size + row_size > max_bytes):
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append((index, row))
+        size += row_size
+    if chunk:
+        yield chunk
+
+
+def _rejects_rows(error: Exception) -> bool:
+    """
+    Whether PostgREST refused the data itself (a 4xx about some row), as
+    opposed to the request failing on the way (transport errors, 5xx).
+    """
+    if not isinstance(error, APIError):
+        return False
+    code = str(error.code or "")
+    # Without a JSON error body, `code` is the HTTP status
+    if code.isdigit() and len(code) == 3:
+        return code.startswith("4")
+    return code.startswith(ROW_ERROR_CODES)
+
+
+class SupabaseService(StorageBackend):
     def __init__(self, url: str, key: str):
         self.client: Client = create_client(url, key)
         logger.info("Connected to Supabase")
@@ -17,27 +63,197 @@ class SupabaseService:
         """Insert a row into the specified table."""
         try:
             response = self.client.table(table_name).insert(data).execute()
-            if response.status_code == 201:
-                logger.info(
-                    "Inserted row into table %s with ID: %s",
-                    table_name,
-                    response.data[0]["id"],
-                )
-                return response.data[0]
-            else:
-                logger.error(
-                    "Failed to insert row into %s: %d - %s",
-                    table_name,
-                    response.status_code,
-                    response.data,
-                )
-                return None
+            logger.info(
+                "Inserted row into table %s with ID: %s",
+                table_name,
+                response.data[0].get("id"),
+            )
+            return response.data[0]
         except Exception as e:
             logger.exception(
                 "Exception occurred while inserting row into %s: %s", table_name, e
             )
             return None
 
+    def insert_rows(
+        self,
+        table_name: str,
+        rows: List[Dict],
+        max_rows: int = BULK_MAX_ROWS,
+        max_bytes: int = BULK_MAX_BYTES,
+        max_concurrency: int = BULK_MAX_CONCURRENCY,
+    ) -> List[RowResult]:
+        """Insert rows in chunked requests sent concurrently."""
+        return self._write_rows(
+            table_name, rows, None, max_rows, max_bytes, max_concurrency
+        )
+
+    def upsert_rows(
+        self,
+        table_name: str,
+        rows: List[Dict],
+        on_conflict: str,
+        max_rows: int = BULK_MAX_ROWS,
+        max_bytes: int = BULK_MAX_BYTES,
+        max_concurrency: int = BULK_MAX_CONCURRENCY,
+    ) -> List[RowResult]:
+        """
+        Insert rows, replacing existing ones that match on `on_conflict`.
+
+        Postgres refuses (21000) an upsert that touches the same row twice, so
+        rows repeating a conflict key are collapsed to the last of them, whose
+        result they all share.
+        """
+        columns = on_conflict.split(",")
+        last: Dict[Tuple, int] = {}
+        for index, row in enumerate(rows):
+            key = tuple(row.get(column) for column in columns)
+            # NULLs never conflict, so such rows are all written
+            if None not in key:
+                last[key] = index
+        kept = [
+            index
+            for index, row in enumerate(rows)
+            if last.get(tuple(row.get(column) for column in columns), index) == index
+        ]
+        if len(kept) < len(rows):
+            logger.info(
+                "Dropped %d rows to %s repeating an %s key",
+                len(rows) - len(kept),
+                table_name,
+                on_conflict,
+            )
+
+        kept_results = self._write_rows(
+            table_name,
+            [rows[index] for index in kept],
+            on_conflict,
+            max_rows,
+            max_bytes,
+            max_concurrency,
+        )
+        by_row = {index: result for index, result in zip(kept, kept_results)}
+        results = []
+        for index, row in enumerate(rows):
+            key = tuple(row.get(column) for column in columns)
+            result = by_row[last.get(key, index)]
+            results.append(result.model_copy(update={"index": index}))
+        return results
+
+    def _write_rows(
+        self,
+        table_name: str,
+        rows: List[Dict],
+        on_conflict: Optional[str],
+        max_rows: int,
+        max_bytes: int,
+        max_concurrency: int,
+    ) -> List[RowResult]:
+        """
+        Write `rows` a chunk per request, up to `max_concurrency` at once.
+
+        Returns one result per row, in input order. A chunk the server rejects
+        as invalid is split in halves until the bad rows are isolated, so they
+        don't fail their neighbours. A chunk lost to a network or server error
+        is not split: upserts are retried once, then the chunk fails as a
+        whole.
+        """
+        chunks = list(_chunk_rows(rows, max_rows, max_bytes))
+        results: List[Optional[RowResult]] = [None] * len(rows)
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            for chunk_results in executor.map(
+                lambda chunk: self._write_chunk(table_name, chunk, on_conflict),
+                chunks,
+            ):
+                for result in chunk_results:
+                    results[result.index] = result
+
+        failed = sum(1 for result in results if not result.ok)
+        logger.info(
+            "Wrote %d rows to %s in %d chunks (%d failed)",
+            len(rows) - failed,
+            table_name,
+            len(chunks),
+            failed,
+        )
+        return results
+
+    def _write_chunk(
+        self,
+        table_name: str,
+        chunk: List[Tuple[int, Dict]],
+        on_conflict: Optional[str],
+        retry: bool = True,
+    ) -> List[RowResult]:
+        try:
+            data = self._execute_write(
+                table_name, [row for _, row in chunk], on_conflict
+            )
+        except Exception as e:
+            if not _rejects_rows(e):
+                # Upserts are idempotent; an insert may have landed already
+                if retry and on_conflict is not None:
+                    logger.warning(
+                        "Retrying chunk of %d rows to %s: %s", len(chunk), table_name, e
+                    )
+                    return self._write_chunk(
+                        table_name, chunk, on_conflict, retry=False
+                    )
+                logger.error(
+                    "Failed to write chunk of %d rows to %s: %s",
+                    len(chunk),
+                    table_name,
+                    e,
+                )
+                return [
+                    RowResult(index=index, ok=False, error=str(e)) for index, _ in chunk
+                ]
+            if len(chunk) == 1:
+                logger.error("Failed to write row to %s: %s", table_name, e)
+                return [RowResult(index=chunk[0][0], ok=False, error=str(e))]
+            logger.warning(
+                "Chunk of %d rows rejected by %s, splitting it: %s",
+                len(chunk),
+                table_name,
+                e,
+            )
+            middle = len(chunk) // 2
+            return self._write_chunk(
+                table_name, chunk[:middle], on_conflict
+            ) + self._write_chunk(table_name, chunk[middle:], on_conflict)
+
+        # PostgREST returns the written rows in request order
+        if len(data) != len(chunk):
+            data = [None] * len(chunk)
+        return [
+            RowResult(index=index, ok=True, data=row)
+            for (index, _), row in zip(chunk, data)
+        ]
+
+    def _execute_write(
+        self, table_name: str, rows: List[Dict], on_conflict: Optional[str]
+    ) -> List[Dict]:
+        table = self.client.table(table_name)
+        if on_conflict is None:
+            query = table.insert(rows)
+        else:
+            query = table.upsert(rows, on_conflict=on_conflict)
+        return query.execute().data or []
+
+    def _select(
+        self,
+        table_name: str,
+        columns: List[str],
+        filters: Optional[Dict[str, Union[str, List[str]]]],
+    ):
+        query = self.client.table(table_name).select(",".join(columns))
+        for key, value in (filters or {}).items():
+            if isinstance(value, list):
+                query = query.in_(key, value)
+            else:
+                query = query.eq(key, value)
+        return query
+
     def get_rows(
         self,
         table_name: str,
@@ -46,31 +262,90 @@ class SupabaseService:
     ) -> Optional[List[Dict]]:
         """Fetch rows from the specified table with optional filters."""
         try:
-            query = self.client.table(table_name).select(",".join(columns))
-            if filters:
-                for key, value in filters.items():
-                    if isinstance(value, list):
-                        query = query.in_(key, value)
-                    else:
-                        query = query.eq(key, value)
-            response = query.execute()
-            if response.status_code == 200:
-                logger.info("Fetched rows from table %s", table_name)
-                return response.data
-            else:
-                logger.error(
-                    "Failed to fetch rows from %s: %d - %s",
-                    table_name,
-                    response.status_code,
-                    response.data,
-                )
-                return None
+            response = self._select(table_name, columns, filters).execute()
+            logger.info("Fetched rows from table %s", table_name)
+            return response.data
         except Exception as e:
             logger.exception(
                 "Exception occurred while fetching rows from %s: %s", table_name, e
             )
             return None
 
+    def get_rows_in(
+        self,
+        table_name: str,
+        column: str,
+        values: List[str],
+        columns: List[str] = ["*"],
+    ) -> Optional[List[Dict]]:
+        """
+        Fetch rows whose `column` is in `values`. Long lists are split into
+        `READ_MAX_IDS` sized requests, run concurrently, so no request URL
+        grows unbounded.
+        """
+        chunks = [
+            values[start : start + READ_MAX_IDS]
+            for start in range(0, len(values), READ_MAX_IDS)
+        ]
+        with ThreadPoolExecutor(max_workers=BULK_MAX_CONCURRENCY) as executor:
+            results = list(
+                executor.map(
+                    lambda chunk: self.get_rows(
+                        table_name, columns=columns, filters={column: chunk}
+                    ),
+                    chunks,
+                )
+            )
+        if any(rows is None for rows in results):
+            return None
+        return [row for rows in results for row in rows]
+
+    def iter_rows(
+        self,
+        table_name: str,
+        columns: List[str] = ["*"],
+        filters: Optional[Dict[str, Union[str, List[str]]]] = None,
+        key: str = "id",
+        page_size: int = READ_PAGE_SIZE,
+    ) -> Iterator[Dict]:
+        """
+        Stream rows ordered by the unique column `key`, one page at a time.
+
+        Pages are fetched by keyset (`key > last seen`) rather than offset, so
+        deep pages cost the same as the first. The next page is requested in
+        the background while the caller consumes the current one. Errors are
+        logged and raised, since a silently truncated stream looks complete.
+        """
+        if "*" not in columns and key not in columns:
+            columns = [*columns, key]
+
+        def fetch(after) -> List[Dict]:
+            query = self._select(table_name, columns, filters)
+            if after is not None:
+                query = query.gt(key, after)
+            return query.order(key).limit(page_size).execute().data
+
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = executor.submit(fetch, None)
+            while True:
+                try:
+                    rows = page.result()
+                except Exception as e:
+                    logger.exception(
+                        "Exception occurred while paging rows from %s: %s",
+                        table_name,
+                        e,
+                    )
+                    raise
+                if len(rows) == page_size:
+                    page = executor.submit(fetch, rows[-1][key])
+                fetched += len(rows)
+                yield from rows
+                if len(rows) < page_size:
+                    break
+        logger.info("Streamed %d rows from table %s", fetched, table_name)
+
     # Specific Table functions
     def insert_job(self, job_data: Dict) -> Optional[Dict]:
         """Insert a job into the jobs table."""
@@ -80,10 +355,35 @@ class SupabaseService:
         """Insert a job vector into the job_vectors table."""
         return self.insert_row(JOB_VECTORS_TABLE, {"job_id": job_id, "vector": vector})
 
-    def get_job_vectors(self) -> Optional[List[Dict]]:
-        """Fetch all job vectors."""
-        return self.get_rows(JOB_VECTORS_TABLE)
+    def upsert_jobs(self, jobs: List[Dict]) -> List[RowResult]:
+        """Insert or replace jobs, keyed by their application URL."""
+        return self.upsert_rows(JOBS_TABLE, jobs, on_conflict=JOBS_CONFLICT_KEY)
+
+    def upsert_job_vectors(self, rows: List[Dict]) -> List[RowResult]:
+        """Insert or replace job vectors, keyed by job_id."""
+        return self.upsert_rows(JOB_VECTORS_TABLE, rows, on_conflict="job_id")
+
+    def get_job_vector_hashes(self, job_ids: List[str]) -> Optional[Dict[str, str]]:
+        """Fetch the content hash each job's vector was embedded from."""
+        rows = self.get_rows_in(
+            JOB_VECTORS_TABLE, "job_id", job_ids, columns=["job_id", "content_hash"]
+        )
+        if rows is None:
+            return None
+        return {row["job_id"]: row["content_hash"] for row in rows}
+
+    def iter_job_vectors(
+        self,
+        columns: List[str] = ["job_id", "vector"],
+        page_size: int = READ_PAGE_SIZE,
+    ) -> Iterator[Dict]:
+        """Stream job vectors, fetching only `columns`."""
+        return self.iter_rows(
+            JOB_VECTORS_TABLE, columns=columns, key="job_id", page_size=page_size
+        )
 
-    def get_jobs_by_ids(self, job_ids: List[str]) -> Optional[List[Dict]]:
+    def get_jobs_by_ids(
+        self, job_ids: List[str], columns: List[str] = ["*"]
+    ) -> Optional[List[Dict]]:
         """Fetch jobs by their IDs."""
-        return self.get_rows(JOBS_TABLE, filters={"id": job_ids})
+        return self.get_rows_in(JOBS_TABLE, "id", job_ids, columns=columns)
@@ -0,0 +1,110 @@
+"""Embed extracted jobs and store their vectors for matching."""
+
+import hashlib
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+from bestintern.database.base import StorageBackend
+from bestintern.tools.llm.llm import LiteLLMEmbedder, LiteLLMEmbeddingModels
+from bestintern.utils.logger import setup_logger
+from config.constants import EMBEDDING_BATCH_SIZE
+from config.models import JobMetadata
+
+logger = setup_logger(__name__)
+
+
+def build_embedding_text(job: JobMetadata) -> str:
+    """Build the canonical text a job is embedded from."""
+    parts = []
+    if job.job_title:
+        parts.append(f"Title: {job.job_title}")
+    if job.skills_required:
+        parts.append(f"Skills: {', '.join(job.skills_required)}")
+    if job.job_description:
+        parts.append(f"Description: {job.job_description}")
+    return "\n".join(parts)
+
+
+def content_hash(model: str, text: str) -> str:
+    """Hash of the embedding input; a new model also invalidates old vectors."""
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+class EmbedResult(BaseModel):
+    """Outcome of `JobEmbedder.embed_jobs`."""
+
+    # Jobs embedded and stored
+    embedded: int = 0
+    # Jobs embedded but not stored, with the storage error
+    failed: Dict[str, str] = {}
+
+
+class JobEmbedder:
+    """
+    Populates the job_vectors table from extracted jobs.
+
+    Each job is embedded from `build_embedding_text`; jobs whose text (and
+    embedding model) hash matches the stored `content_hash` are skipped. The
+    rest are embedded and upserted on job_id one batch at a time.
+    """
+
+    def __init__(
+        self,
+        storage: StorageBackend,
+        model: LiteLLMEmbeddingModels = LiteLLMEmbeddingModels.gemini,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+    ):
+        self.storage = storage
+        self.embedder = LiteLLMEmbedder(model=model, batch_size=batch_size)
+        self.batch_size = batch_size
+
+    def embed_jobs(self, jobs: Dict[str, JobMetadata]) -> EmbedResult:
+        """
+        Embed and store vectors for `jobs`, keyed by job id. Returns how many
+        jobs were (re-)embedded and stored, and the ones whose vector could
+        not be stored; those are retried on the next run, as their stored
+        hash is unchanged.
+        """
+        texts = {job_id: build_embedding_text(job) for job_id, job in jobs.items()}
+        hashes = {
+            job_id: content_hash(self.embedder.model, text)
+            for job_id, text in texts.items()
+        }
+
+        stored_hashes = self.storage.get_job_vector_hashes(list(jobs)) or {}
+        changed: List[str] = [
+            job_id
+            for job_id, text in texts.items()
+            if text and stored_hashes.get(job_id) != hashes[job_id]
+        ]
+        logger.info(
+            "Embedding %d of %d jobs (%d unchanged)",
+            len(changed),
+            len(jobs),
+            len(jobs) - len(changed),
+        )
+
+        result = EmbedResult()
+        for start in range(0, len(changed), self.batch_size):
+            batch = changed[start : start + self.batch_size]
+            vectors = self.embedder.embed([texts[job_id] for job_id in batch])
+            row_results = self.storage.upsert_job_vectors(
+                [
+                    {"job_id": job_id, "vector": vector, "content_hash": hashes[job_id]}
+                    for job_id, vector in zip(batch, vectors)
+                ]
+            )
+            for row_result in row_results:
+                if row_result.ok:
+                    result.embedded += 1
+                else:
+                    result.failed[batch[row_result.index]] = row_result.error or ""
+
+        if result.failed:
+            logger.error(
+                "Failed to store vectors of %d jobs: %s",
+                len(result.failed),
+                ", ".join(result.failed),
+            )
+        return result
@@ -7,11 +7,15 @@ Steps:
 - run `python -m bestintern.services.example.job`
 """
 
+import asyncio
+
 from dotenv import load_dotenv
 
-from bestintern.services.parse.job import JobParser, WaitOptions
+from bestintern.services.parse.job import JobParser, WaitOptions, parse_jobs
 from bestintern.tools.llm.llm import LiteLLMModels
 from bestintern.tools.llm.modeler import LLMDataExtracted
+from bestintern.tools.web.driver import WebDriverPool
+from bestintern.utils import metrics
 
 load_dotenv()
 
@@ -24,19 +28,39 @@ def main():
         "https://careers.tiktok.com/position/7393074791714834739/detail",
     ]
 
-    for job_url in job_urls:
-        job_parser = JobParser(
-            url=job_url,
-            use_selenium=True,
-            wait_options=WaitOptions(timeout=5),  # waits for page to load
-            llm_model=LiteLLMModels.gemini_flash,
-        )
+    # Warm browsers are shared by every page instead of starting one per job
+    with WebDriverPool(size=2) as driver_pool:
+        for job_url in job_urls:
+            job_parser = JobParser(
+                url=job_url,
+                use_selenium=True,
+                wait_options=WaitOptions(timeout=5),  # waits for page to load
+                llm_model=LiteLLMModels.gemini_flash,
+                driver_pool=driver_pool,
+            )
+
+            extracted_data: LLMDataExtracted = job_parser.parse_job()
+
+            print("Extracted Job Data:")
+            print(extracted_data.data.model_dump_json(indent=4))
+
 
-        extracted_data: LLMDataExtracted = job_parser.parse_job()
+async def main_batch():
+    # Pages that render without javascript can be crawled concurrently
+    job_urls = [
+        "https://careers.tiktok.com/position/7393074791714834739/detail",
+    ]
 
-        print("Extracted Job Data:")
+    # Time each stage and count tokens, printed in Prometheus format at the end
+    metrics.enable()
+    async for job_url, extracted_data in parse_jobs(
+        job_urls, llm_model=LiteLLMModels.gemini_flash
+    ):
+        print(f"Extracted Job Data from {job_url}:")
         print(extracted_data.data.model_dump_json(indent=4))
+    print(metrics.export_prometheus())
 
 
 if __name__ == "__main__":
     main()
+    asyncio.run(main_batch())
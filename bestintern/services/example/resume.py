@@ -7,11 +7,12 @@ Steps:
 - run `python -m bestintern.services.example.resume`
 """
 
+import asyncio
 import os
 
 from dotenv import load_dotenv
 
-from bestintern.services.parse.resume import ResumeParser
+from bestintern.services.parse.resume import ResumeParser, parse_resumes
 from bestintern.tools.llm.llm import LiteLLMModels
 from bestintern.tools.llm.modeler import LLMDataExtracted
 
@@ -34,5 +35,18 @@ def main():
     print(extracted_data.data.model_dump_json(indent=4))
 
 
+async def main_batch():
+    # Many resumes are read in worker processes while the LLM extracts others
+    relative_path = os.path.dirname(os.path.abspath(__file__))
+    pdf_paths = [os.path.join(relative_path, "basic_cs_freak.pdf")]
+
+    async for pdf_path, extracted_data in parse_resumes(
+        pdf_paths, llm_model=LiteLLMModels.gemini_flash
+    ):
+        print(f"Extracted Resume Data from {pdf_path}:")
+        print(extracted_data.data.model_dump_json(indent=4))
+
+
 if __name__ == "__main__":
     main()
+    asyncio.run(main_batch())
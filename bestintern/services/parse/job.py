@@ -1,48 +1,387 @@
 """Parse job postings from webpages and build a job model."""
 
-from typing import Optional
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
 
+from bestintern.services.parse.rules import job_fields
 from bestintern.tools.llm.llm import LiteLLMModels
-from bestintern.tools.llm.modeler import LLMDataExtracted, LLMDataExtractor
+from bestintern.tools.llm.modeler import (
+    ExtractionCache,
+    LLMDataExtracted,
+    LLMDataExtractor,
+)
+from bestintern.tools.llm.preprocess import strip_boilerplate
+from bestintern.tools.web.ats import ATSRegistry, shared_registry
+from bestintern.tools.web.crawler import AsyncWebFetcher
+from bestintern.tools.web.dedup import SimHashIndex
+from bestintern.tools.web.driver import WebDriverPool
+from bestintern.tools.web.jsonld import find_job_posting, job_posting_fields
 from bestintern.tools.web.reader import WaitOptions, WebpageReader
+from bestintern.tools.web.state import CrawlState, CrawlStateStore, text_hash
+from bestintern.utils.logger import setup_logger
+from bestintern.utils.metrics import span
+from config.constants import CRAWL_MAX_CONCURRENCY, CRAWL_MAX_PER_HOST
 from config.models import JobMetadata
 
+logger = setup_logger(__name__)
+
+
+def _dump_extraction(extracted_data: LLMDataExtracted) -> Dict:
+    return {
+        "data": extracted_data.data.model_dump(mode="json"),
+        "not_found": extracted_data.not_found,
+    }
+
+
+def _load_extraction(payload: Dict) -> LLMDataExtracted:
+    return LLMDataExtracted(
+        data=JobMetadata.model_validate(payload["data"]),
+        not_found=payload["not_found"],
+    )
+
 
 class JobParser:
+    """
+    Fetches a job posting and extracts a `JobMetadata` from it with the LLM.
+
+    With a `state_store`, parsing is incremental: the page is requested with
+    the validators from the last crawl, and when the server answers 304 or the
+    cleaned text hashes the same as last time, the previous extraction is
+    returned without calling the LLM (`unchanged` is then True).
+
+    With a `dedup_index`, a posting whose cleaned text is a near-duplicate of
+    one already extracted under another URL (a repost on another board)
+    reuses that extraction too; `duplicate_of` is then the original URL.
+
+    Postings on a known applicant-tracking system (Greenhouse, Lever, Ashby,
+    Workday) are read from its JSON API through `ats_registry` instead of
+    rendering the page; other sites are read with `WebpageReader`.
+
+    With `use_rules`, fields stated in a schema.org JobPosting JSON-LD block
+    are mapped directly, the application URL, labelled dates, remote flag and
+    salary are taken from the page by pattern when present, and the LLM is
+    only asked for the other fields. If the LLM fails, the result holds only
+    those fields and has `llm_failed` set; it is not stored for reuse.
+
+    With a `cache`, LLM extractions are looked up in and added to it.
+    """
+
     def __init__(
         self,
         url: str,
         llm_model: LiteLLMModels,
         use_selenium: bool = False,
         wait_options: Optional[WaitOptions] = None,
+        driver_pool: Optional[WebDriverPool] = None,
+        state_store: Optional[CrawlStateStore] = None,
+        dedup_index: Optional[SimHashIndex] = None,
+        use_rules: bool = True,
+        ats_registry: Optional[ATSRegistry] = None,
+        cache: Optional[ExtractionCache] = None,
     ):
         self.url = url
         self.llm_model = llm_model
         self.use_selenium = use_selenium
         self.wait_options = wait_options
+        self.driver_pool = driver_pool
+        self.state_store = state_store
+        self.dedup_index = dedup_index
+        self.use_rules = use_rules
+        self.ats_registry = ats_registry or shared_registry()
+        self.cache = cache
+        self.previous_state: Optional[CrawlState] = None
+        self.unchanged = False
+        self.duplicate_of: Optional[str] = None
+        self._cleaned_text: Optional[str] = None
         self.extracted_data = None
 
     def parse_job(self) -> LLMDataExtracted:
-        # Step 1: Get a webpage
+        with span("parse_job"):
+            headers = self.conditional_headers()
+
+            with span("fetch"):
+                # Step 1: Get the posting from its ATS's API, or else the webpage
+                webpage_reader = self.ats_registry.read(self.url, headers=headers)
+                if webpage_reader is None:
+                    webpage_reader = WebpageReader(
+                        self.url, driver_pool=self.driver_pool
+                    )
+
+                    # Step 2: Read the webpage content
+                    webpage_reader.read_webpage(
+                        use_selenium=self.use_selenium,
+                        wait_options=self.wait_options,
+                        headers=headers,
+                    )
+            return self.extract_job(webpage_reader)
+
+    async def fetch_async(self, fetcher: AsyncWebFetcher) -> Optional[WebpageReader]:
+        """
+        Fetch the posting over `fetcher`'s connection pool: from its ATS's
+        API when the URL is recognized, else the page itself. Returns None if
+        it cannot be fetched.
+        """
+        # The state store and dedup index are SQLite files; their I/O must not
+        # block the event loop
+        headers = await asyncio.to_thread(self.conditional_headers)
+        webpage_reader = await self.ats_registry.read_async(self.url, fetcher, headers)
+        if webpage_reader is not None:
+            return webpage_reader
+
+        page = await fetcher.fetch_page(self.url, headers)
+        if page is None:
+            return None
         webpage_reader = WebpageReader(self.url)
+        if page.not_modified:
+            webpage_reader.not_modified = True
+        else:
+            webpage_reader.load_html(page.body, charset=page.charset)
+            webpage_reader.etag = page.etag
+            webpage_reader.last_modified = page.last_modified
+        return webpage_reader
+
+    def extract_job(self, webpage_reader: WebpageReader) -> LLMDataExtracted:
+        """Build the job model from a webpage that has already been read."""
+        previous_data = self._reuse_previous(webpage_reader) or self._reuse_duplicate(
+            webpage_reader
+        )
+        if previous_data is not None:
+            return previous_data
+        text_content = self._read_content(webpage_reader)
 
-        # Step 2: Read the webpage content
-        webpage_reader.read_webpage(
-            use_selenium=self.use_selenium, wait_options=self.wait_options
+        # Step 4: Ask the LLM to parse through the data
+        llm_extractor = LLMDataExtractor(model=self.llm_model, cache=self.cache)
+        extracted_data = llm_extractor.extract_data(
+            text_content,
+            JobMetadata,
+            preprocess=True,
+            known_fields=self._known_fields(webpage_reader),
         )
-        text_content = webpage_reader.get_text(remove_multiple_newlines=True)
+        if not extracted_data.llm_failed:
+            self._remember(webpage_reader, extracted_data)
+        self.extracted_data = extracted_data
+        return extracted_data
 
-        # Step 3: Extract metadata (if needed)
-        metadata = webpage_reader.extract_metadata(
-            tags=["meta", "h1", "h2", "p"]
-        )  # Example tags
+    async def extract_job_async(
+        self, webpage_reader: WebpageReader
+    ) -> LLMDataExtracted:
+        """Same as `extract_job`, using the rate-limited async LLM client."""
+        previous_data = await asyncio.to_thread(self._reuse_previous, webpage_reader)
+        if previous_data is None:
+            previous_data = await asyncio.to_thread(
+                self._reuse_duplicate, webpage_reader
+            )
+        if previous_data is not None:
+            return previous_data
+        text_content = self._read_content(webpage_reader)
 
         # Step 4: Ask the LLM to parse through the data
-        llm_extractor = LLMDataExtractor(model=self.llm_model)
-        extracted_data = llm_extractor.extract_data(text_content, JobMetadata)
+        llm_extractor = LLMDataExtractor(model=self.llm_model, cache=self.cache)
+        extracted_data = await llm_extractor.extract_data_async(
+            text_content,
+            JobMetadata,
+            preprocess=True,
+            known_fields=self._known_fields(webpage_reader),
+        )
+        if not extracted_data.llm_failed:
+            await asyncio.to_thread(self._remember, webpage_reader, extracted_data)
         self.extracted_data = extracted_data
         return extracted_data
 
+    def conditional_headers(self) -> Optional[Dict[str, str]]:
+        """Validators from the last crawl, if it left an extraction to reuse."""
+        if self.state_store is None:
+            return None
+        self.previous_state = self.state_store.get(self.url)
+        if self.previous_state is None or self.previous_state.extraction is None:
+            return None
+        return self.previous_state.conditional_headers()
+
+    def _reuse_previous(
+        self, webpage_reader: WebpageReader
+    ) -> Optional[LLMDataExtracted]:
+        """Return the last crawl's extraction if the page has not changed."""
+        previous = self.previous_state
+        if previous is None or previous.extraction is None:
+            return None
+        if not webpage_reader.not_modified:
+            if previous.text_hash != self._text_hash(webpage_reader):
+                return None
+            # Same text behind new validators; remember them for next time
+            previous.etag = webpage_reader.etag
+            previous.last_modified = webpage_reader.last_modified
+        previous.crawled_at = time.time()
+        self.state_store.put(previous)
+
+        logger.info("Job posting %s is unchanged, skipping extraction", self.url)
+        self.unchanged = True
+        self.extracted_data = _load_extraction(previous.extraction)
+        return self.extracted_data
+
+    def _reuse_duplicate(
+        self, webpage_reader: WebpageReader
+    ) -> Optional[LLMDataExtracted]:
+        """Return the extraction of an indexed near-duplicate posting, if any."""
+        fingerprint = self._fingerprint(webpage_reader)
+        if fingerprint is None:
+            return None
+        duplicate = self.dedup_index.find(fingerprint, url=self.url)
+        if duplicate is None or duplicate.payload is None:
+            return None
+
+        logger.info(
+            "Job posting %s duplicates %s (%d bits apart), skipping extraction",
+            self.url,
+            duplicate.url,
+            duplicate.distance,
+        )
+        self.duplicate_of = duplicate.url
+        self.extracted_data = _load_extraction(duplicate.payload)
+        self._remember(webpage_reader, self.extracted_data)
+        return self.extracted_data
+
+    def _remember(
+        self, webpage_reader: WebpageReader, extracted_data: LLMDataExtracted
+    ) -> None:
+        payload = _dump_extraction(extracted_data)
+        if self.state_store is not None:
+            self.state_store.put(
+                CrawlState(
+                    url=self.url,
+                    etag=webpage_reader.etag,
+                    last_modified=webpage_reader.last_modified,
+                    text_hash=self._text_hash(webpage_reader),
+                    extraction=payload,
+                )
+            )
+        fingerprint = self._fingerprint(webpage_reader)
+        if fingerprint is not None:
+            self.dedup_index.add(self.url, fingerprint, payload)
+
+    def _fingerprint(self, webpage_reader: WebpageReader) -> Optional[int]:
+        """SimHash of the cleaned text; None without an index or enough text."""
+        if self.dedup_index is None:
+            return None
+        return self.dedup_index.fingerprint(self._clean_text(webpage_reader))
+
+    def _known_fields(self, webpage_reader: WebpageReader) -> Optional[Dict]:
+        """Fields found without the LLM: page rules, overridden by JSON-LD."""
+        if not self.use_rules:
+            return None
+        with span("rules"):
+            # On the cleaned text, so site navigation ("Remote jobs") is not read
+            known_fields = job_fields(self._clean_text(webpage_reader), url=self.url)
+
+            posting = find_job_posting(webpage_reader.json_ld)
+            if posting is not None:
+                structured = job_posting_fields(posting)
+                known_fields.update(
+                    (field, value) for field, value in structured.items() if value
+                )
+                logger.info(
+                    "Job posting %s has JobPosting data for %d fields",
+                    self.url,
+                    sum(1 for value in structured.values() if value),
+                )
+        return known_fields
+
+    def _clean_text(self, webpage_reader: WebpageReader) -> str:
+        # The posting without site chrome, which changes between visits
+        if self._cleaned_text is None:
+            self._cleaned_text = "\n".join(strip_boilerplate(webpage_reader.get_text()))
+        return self._cleaned_text
+
+    def _text_hash(self, webpage_reader: WebpageReader) -> str:
+        return text_hash(self._clean_text(webpage_reader))
+
+    def _read_content(self, webpage_reader: WebpageReader) -> str:
+        return webpage_reader.get_text(remove_multiple_newlines=True)
+
     def save_job_model(self, extracted_data: LLMDataExtracted, output_dir: str) -> None:
         # just save the data in some sort of database lmao
         raise NotImplementedError()
+
+
+async def parse_jobs(
+    urls: Iterable[str],
+    llm_model: LiteLLMModels,
+    max_concurrency: int = CRAWL_MAX_CONCURRENCY,
+    max_per_host: int = CRAWL_MAX_PER_HOST,
+    state_store: Optional[CrawlStateStore] = None,
+    dedup_index: Optional[SimHashIndex] = None,
+    ats_registry: Optional[ATSRegistry] = None,
+    cache: Optional[ExtractionCache] = None,
+) -> AsyncIterator[Tuple[str, LLMDataExtracted]]:
+    """
+    Parse many job postings concurrently.
+
+    `max_concurrency` workers take URLs from `urls` as they free up, so it can
+    be a long or lazy iterable, and pause while their results go unread. Pages
+    are fetched over a shared connection pool with at most `max_concurrency`
+    requests in flight and `max_per_host` per domain. Results
+    are yielded as `(url, extracted_data)` pairs in completion order; postings
+    that fail to fetch or extract, including those the LLM failed on, are
+    logged and skipped. With a
+    `state_store`, postings unchanged since the last crawl are skipped too, and
+    with a `dedup_index` so are near-duplicates of postings already parsed.
+    Postings on a known applicant-tracking system are fetched from its API.
+    Extractions are looked up in and added to `cache`, if given.
+    """
+    async with AsyncWebFetcher(
+        max_concurrency=max_concurrency, max_per_host=max_per_host
+    ) as fetcher:
+
+        async def parse_one(url: str) -> Tuple[str, Optional[LLMDataExtracted]]:
+            job_parser = JobParser(
+                url=url,
+                llm_model=llm_model,
+                state_store=state_store,
+                dedup_index=dedup_index,
+                ats_registry=ats_registry,
+                cache=cache,
+            )
+            with span("parse_job"):
+                # One bad posting (or LLM error) must not end the whole batch
+                try:
+                    with span("fetch"):
+                        webpage_reader = await job_parser.fetch_async(fetcher)
+                    if webpage_reader is None:
+                        return url, None
+                    extracted_data = await job_parser.extract_job_async(webpage_reader)
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.error("Failed to parse job from %s: %s", url, e)
+                    return url, None
+            if extracted_data.llm_failed:
+                logger.error("Failed to extract job from %s with the LLM", url)
+                return url, None
+            if job_parser.unchanged or job_parser.duplicate_of:
+                return url, None
+            return url, extracted_data
+
+        # Workers pull URLs as they free up and wait while results go unread,
+        # so neither `urls` nor the results pile up in memory
+        pending_urls = iter(urls)
+        results: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency)
+
+        async def worker() -> None:
+            for url in pending_urls:
+                await results.put(await parse_one(url))
+            await results.put(None)
+
+        workers = [
+            asyncio.ensure_future(worker()) for _ in range(max(1, max_concurrency))
+        ]
+        try:
+            running = len(workers)
+            while running:
+                result = await results.get()
+                if result is None:
+                    running -= 1
+                    continue
+                url, extracted_data = result
+                if extracted_data is not None:
+                    yield url, extracted_data
+        finally:
+            for task in workers:
+                task.cancel()
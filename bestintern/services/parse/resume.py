@@ -1,33 +1,207 @@
 """Parse resumes pdfs and build a model."""
 
+import asyncio
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Tuple
+
+from bestintern.services.parse.rules import resume_fields
 from bestintern.tools.llm.llm import LiteLLMModels
-from bestintern.tools.llm.modeler import LLMDataExtracted, LLMDataExtractor
+from bestintern.tools.llm.modeler import (
+    ExtractionCache,
+    LLMDataExtracted,
+    LLMDataExtractor,
+)
 from bestintern.tools.pdf.reader import PDFReader
+from bestintern.utils.logger import setup_logger
+from bestintern.utils.metrics import span
+from config.constants import (
+    RESUME_MAX_PAGES,
+    RESUME_MAX_PENDING,
+    RESUME_MAX_WORKERS,
+    RESUME_PARSE_TIMEOUT,
+)
 from config.models import ResumeMetadata
 
+logger = setup_logger(__name__)
+
+
+class _ReadTimeout(BaseException):
+    # Not an Exception, so PDF parsing code that catches and recovers from
+    # errors cannot swallow it
+    pass
+
+
+def read_resume_text(pdf_path: str, timeout: Optional[float] = None) -> str:
+    """
+    Text of a resume PDF. With `timeout`, reading is interrupted after that
+    many seconds (where SIGALRM exists), so a pathological PDF cannot hold a
+    pool worker. Meant to run in a worker process: the alarm is per process.
+    """
+    if timeout is None or not hasattr(signal, "SIGALRM"):
+        return PDFReader(pdf_path, max_pages=RESUME_MAX_PAGES).get_full_text()
+
+    def on_timeout(signum, frame):
+        raise _ReadTimeout()
+
+    previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+    try:
+        try:
+            # Keeps firing until reading stops, in case one lands somewhere
+            # exceptions are ignored (e.g. a finalizer)
+            signal.setitimer(signal.ITIMER_REAL, timeout, 0.1)
+            return PDFReader(pdf_path, max_pages=RESUME_MAX_PAGES).get_full_text()
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except _ReadTimeout:
+        raise TimeoutError(f"Reading {pdf_path} took over {timeout} seconds") from None
+    finally:
+        signal.signal(signal.SIGALRM, previous_handler)
+
 
 class ResumeParser:
-    def __init__(self, pdf_path: str, llm_model: LiteLLMModels):
+    """
+    Reads a resume PDF and extracts a `ResumeMetadata` from it with the LLM.
+
+    With `use_rules`, the email and phone number are taken from the text by
+    pattern, and the LLM is only asked for the other fields. With a `cache`,
+    a resume already extracted is not sent to the LLM again.
+    """
+
+    def __init__(
+        self,
+        pdf_path: str,
+        llm_model: LiteLLMModels,
+        use_rules: bool = True,
+        cache: Optional[ExtractionCache] = None,
+    ):
         self.pdf_path = pdf_path
         self.llm_model = llm_model
+        self.use_rules = use_rules
+        self.cache = cache
         self.extracted_data = None
 
     def parse_resume(self) -> LLMDataExtracted:
-        # Step 1: Get a resume
-        pdf_reader = PDFReader(self.pdf_path)
+        with span("parse_resume"):
+            # Step 1 and 2: Get a resume and extract its text
+            with span("pdf_extract"):
+                text_content = read_resume_text(self.pdf_path)
+
+            return self.extract_resume(text_content)
+
+    def extract_resume(self, text_content: str) -> LLMDataExtracted:
+        """Build the resume model from text that has already been read."""
+        # Step 3: Ask the LLM to parse through the data
+        llm_extractor = LLMDataExtractor(model=self.llm_model, cache=self.cache)
+        extracted_data = llm_extractor.extract_data(
+            text_content, ResumeMetadata, known_fields=self._rule_fields(text_content)
+        )
 
-        # Step 2: Extract data and metadata
-        text_content = pdf_reader.get_full_text()
+        self.extracted_data = extracted_data
+        return extracted_data
 
+    async def extract_resume_async(self, text_content: str) -> LLMDataExtracted:
+        """Same as `extract_resume`, using the rate-limited async LLM client."""
         # Step 3: Ask the LLM to parse through the data
-        llm_extractor = LLMDataExtractor(model=self.llm_model)
-        extracted_data = llm_extractor.extract_data(text_content, ResumeMetadata)
+        llm_extractor = LLMDataExtractor(model=self.llm_model, cache=self.cache)
+        extracted_data = await llm_extractor.extract_data_async(
+            text_content, ResumeMetadata, known_fields=self._rule_fields(text_content)
+        )
 
         self.extracted_data = extracted_data
         return extracted_data
 
+    def _rule_fields(self, text_content: str) -> Optional[Dict[str, Any]]:
+        if not self.use_rules:
+            return None
+        with span("rules"):
+            return resume_fields(text_content)
+
     def save_resume_model(
         self, extracted_data: LLMDataExtracted, output_dir: str
     ) -> None:
         # must save the data in some sort of database lmao
         raise NotImplementedError()
+
+
+async def parse_resumes(
+    pdf_paths: Iterable[str],
+    llm_model: LiteLLMModels,
+    max_workers: int = RESUME_MAX_WORKERS,
+    max_pending: int = RESUME_MAX_PENDING,
+    timeout: float = RESUME_PARSE_TIMEOUT,
+    cache: Optional[ExtractionCache] = None,
+) -> AsyncIterator[Tuple[str, LLMDataExtracted]]:
+    """
+    Parse many resumes, reading PDFs in `max_workers` processes while the
+    LLM extracts the resumes already read.
+
+    At most `max_pending` resumes are read, extracted or waiting to be
+    consumed at a time; `pdf_paths` is only advanced as results are taken,
+    so it can be a lazy iterable of any length. Reading a PDF is stopped
+    after `timeout` seconds. Results are yielded as `(pdf_path,
+    extracted_data)` pairs in completion order; resumes that fail to read or
+    extract are logged and skipped. Extractions are looked up in and added to
+    `cache`, if given.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(max_pending)
+    results: asyncio.Queue = asyncio.Queue()
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+
+    async def read_and_extract(pdf_path: str) -> Optional[LLMDataExtracted]:
+        try:
+            # The worker stops itself at `timeout`; waiting a little longer
+            # covers platforms without SIGALRM and a worker that is stuck.
+            # Timed here, as workers' metrics stay in their own process
+            with span("pdf_extract"):
+                text_content = await asyncio.wait_for(
+                    loop.run_in_executor(pool, read_resume_text, pdf_path, timeout),
+                    timeout + 1,
+                )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Failed to read resume %s: %s", pdf_path, e)
+            return None
+
+        resume_parser = ResumeParser(
+            pdf_path=pdf_path, llm_model=llm_model, cache=cache
+        )
+        try:
+            return await resume_parser.extract_resume_async(text_content)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Failed to extract resume %s: %s", pdf_path, e)
+            return None
+
+    async def parse_one(pdf_path: str) -> None:
+        with span("parse_resume"):
+            extracted_data = await read_and_extract(pdf_path)
+        results.put_nowait((pdf_path, extracted_data))
+
+    async def submit_all() -> None:
+        tasks = set()
+        try:
+            for pdf_path in pdf_paths:
+                await slots.acquire()
+                task = asyncio.ensure_future(parse_one(pdf_path))
+                task.add_done_callback(tasks.discard)
+                tasks.add(task)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            results.put_nowait(None)
+
+    producer = asyncio.ensure_future(submit_all())
+    try:
+        while True:
+            result = await results.get()
+            if result is None:
+                break
+            slots.release()
+            pdf_path, extracted_data = result
+            if extracted_data is not None:
+                yield pdf_path, extracted_data
+        await producer
+    finally:
+        producer.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
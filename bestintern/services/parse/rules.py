@@ -0,0 +1,126 @@
+"""Fields that simple patterns find reliably, so the LLM is not asked for them."""
+
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from bestintern.tools.pdf.reader import scan_metadata
+
+_MONTH = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|"
+    r"Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+)
+_DATE = (
+    rf"{_MONTH}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}"
+    r"|\d{4}-\d{2}-\d{2}"
+    r"|\d{1,2}/\d{1,2}/\d{4}"
+)
+_DATE_FORMATS = ["%B %d %Y", "%b %d %Y", "%Y-%m-%d", "%m/%d/%Y"]
+_POSTED_DATE = re.compile(
+    rf"\b(?:date\s+posted|posted(?:\s+on)?)\s*:?\s*(?P<date>{_DATE})", re.IGNORECASE
+)
+_DEADLINE = re.compile(
+    rf"\b(?:(?:application\s+)?deadline|apply\s+by|closes?(?:\s+on)?|closing\s+date)"
+    rf"\s*:?\s*(?P<date>{_DATE})",
+    re.IGNORECASE,
+)
+# "Location: Remote - US", "Workplace type: On-site", or the label on its own
+# line above the value. Free text ("remote-first culture") is left to the LLM
+_WORKPLACE = re.compile(
+    r"^[ \t]*(?:job\s+|office\s+)?(?:locations?|workplace(?:\s+type)?|"
+    r"work(?:place)?\s+(?:location|arrangement|type|model))"
+    r"(?::[ \t]*|[ \t]*\n\s*)(?P<value>[^\n]+)",
+    re.IGNORECASE | re.MULTILINE,
+)
+_NOT_REMOTE = re.compile(r"\b(?:not|no|non)[\s-]+remote\b", re.IGNORECASE)
+_HYBRID = re.compile(r"\bhybrid\b", re.IGNORECASE)
+_ONSITE = re.compile(r"\bon[\s-]?site\b|\bin[\s-](?:the[\s-])?office\b", re.IGNORECASE)
+_REMOTE = re.compile(r"\bremote\b", re.IGNORECASE)
+# "$120,000 - $150,000 per year", "$45/hr", "$90k-$110k"
+_AMOUNT = r"\$\s?\d{1,3}(?:,\d{3})+(?:\.\d{2})?|\$\s?\d+(?:\.\d+)?\s?[kK]?\b"
+_SALARY = re.compile(
+    rf"(?P<low>{_AMOUNT})(?:\s*(?:-|–|to)\s*(?P<high>{_AMOUNT}))?"
+    r"(?:\s*(?:/|per)\s*(?P<period>year|yr|annum|hour|hr|month|mo)\b)?",
+    re.IGNORECASE,
+)
+# Words that make an amount pay rather than a bonus, a fee or a perk
+_PAY = re.compile(
+    r"\b(?:salary|pay|compensation|wages?|stipend|(?:hourly|pay)\s+rate)\b",
+    re.IGNORECASE,
+)
+# Characters before an amount, on its line, searched for `_PAY`
+_PAY_WINDOW = 80
+
+
+def _parse_date(text: str) -> Optional[date]:
+    text = re.sub(r"(?<=\d)(?:st|nd|rd|th)|[.,]", "", text)
+    text = " ".join(text.split())
+    # "Sept" is not a strptime abbreviation
+    text = re.sub(r"^Sept\b", "Sep", text, flags=re.IGNORECASE)
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _first_in_text(text: str, values: List[str]) -> Optional[str]:
+    # Contact details come first on a resume; anything later is someone else's
+    return min(values, key=text.index) if values else None
+
+
+def resume_fields(text: str) -> Dict[str, Any]:
+    """Email and phone number of a resume, using the PDF reader's patterns."""
+    metadata = scan_metadata(text)
+    return {
+        "email": _first_in_text(text, metadata["emails"]),
+        "phone": _first_in_text(text, metadata["phone_numbers"]),
+    }
+
+
+def _remote(value: str) -> Optional[bool]:
+    """Remote flag of a labelled workplace value; None if it is not clear."""
+    if _NOT_REMOTE.search(value):
+        return False
+    remote, onsite = bool(_REMOTE.search(value)), bool(_ONSITE.search(value))
+    if remote != onsite:
+        return remote
+    return None
+
+
+def _salary(text: str) -> Optional[str]:
+    """The one pay range (or rate) the text states next to a pay word."""
+    found = set()
+    for salary in _SALARY.finditer(text):
+        if not (salary.group("high") or salary.group("period")):
+            continue
+        line_start = text.rfind("\n", 0, salary.start()) + 1
+        before = text[max(line_start, salary.start() - _PAY_WINDOW) : salary.start()]
+        if _PAY.search(before):
+            found.add(" ".join(salary.group().split()))
+    return found.pop() if len(found) == 1 else None
+
+
+def job_fields(text: str, url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Labelled posting and deadline dates, remote flag and salary of a job
+    posting, plus `url` as its application URL. Fields the rules cannot
+    decide, or find conflicting answers for, are None and left to the LLM.
+    """
+    fields: Dict[str, Any] = {"application_url": url}
+
+    for field, pattern in (("posted_date", _POSTED_DATE), ("deadline", _DEADLINE)):
+        match = pattern.search(text)
+        fields[field] = _parse_date(match.group("date")) if match else None
+
+    # Hybrid roles are left to the LLM
+    workplaces = [match.group("value") for match in _WORKPLACE.finditer(text)]
+    remote = {_remote(value) for value in workplaces} - {None}
+    if len(remote) == 1 and not any(_HYBRID.search(value) for value in workplaces):
+        fields["remote"] = remote.pop()
+    else:
+        fields["remote"] = None
+
+    fields["salary_range"] = _salary(text)
+    return fields
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark of the per-call prompt overhead in LLMDataExtractor.
+
+Compares rebuilding the schema, field spec and jinja template on every call
+(the previous behaviour) with reusing the compiled `ExtractionPlan`. No LLM
+calls are made.
+
+Steps:
+- run `python -m bestintern.tools.llm.example.benchmark`
+"""
+
+import os
+from timeit import timeit
+
+from jinja2 import Environment, FileSystemLoader
+
+from bestintern.tools.llm.modeler import TEMPLATE_DIR, get_extraction_plan
+from bestintern.utils.utils import clean_json_structure
+from config.models import JobMetadata, ResumeMetadata
+
+ITERATIONS = 2000
+
+
+def rebuild_every_call(text: str, model_class) -> None:
+    # prompt generation
+    schema = model_class.model_json_schema()
+    fields_info = clean_json_structure(schema)
+    env = Environment(loader=FileSystemLoader(os.path.join(TEMPLATE_DIR, "templates")))
+    env.get_template("extract_data.j2").render(fields_info=fields_info, text=text)
+    # missing field detection
+    set(model_class.model_json_schema()["properties"].keys())
+
+
+def compiled_plan(text: str, model_class) -> None:
+    plan = get_extraction_plan(model_class)
+    plan.render(text)
+    plan.fields
+
+
+def main():
+    relative_path = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(relative_path, "job_description.txt"), "r") as file:
+        text = file.read()
+
+    for model_class in (JobMetadata, ResumeMetadata):
+        before = timeit(
+            lambda: rebuild_every_call(text, model_class), number=ITERATIONS
+        )
+        after = timeit(lambda: compiled_plan(text, model_class), number=ITERATIONS)
+        print(
+            f"{model_class.__name__}: "
+            f"{before / ITERATIONS * 1e6:.1f} us/call before, "
+            f"{after / ITERATIONS * 1e6:.1f} us/call after "
+            f"({before / after:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Check that trimming a posting to a tight token budget keeps what the LLM
+extracts from it.
+
+Trims the example posting to `TOKEN_BUDGET` tokens with the `JobMetadata`
+keywords and asserts that its responsibilities and requirements survive,
+while the equal-opportunity boilerplate does not. No LLM calls are made.
+
+Steps:
+- run `python -m bestintern.tools.llm.example.relevance`
+"""
+
+import os
+
+from bestintern.tools.llm.modeler import get_extraction_plan
+from bestintern.tools.llm.preprocess import preprocess_text
+from config.models import JobMetadata
+
+TOKEN_BUDGET = 600
+
+# Lines of the posting that must be kept, by what they are extracted into
+EXPECTED = {
+    "responsibilities": "Design and implement changes in NVIDIA SW stack",
+    "education": "BS or MS degree in Computer Engineering",
+    "skills": "Strong C/C++ programming skills",
+    "experience": "8+ years of meaningful software development experience",
+}
+UNEXPECTED = {
+    "equal opportunity": "we do not discriminate",
+}
+
+
+def main():
+    relative_path = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(relative_path, "job_description.txt"), "r") as file:
+        text = file.read()
+
+    keywords = get_extraction_plan(JobMetadata).keywords
+    result = preprocess_text(text, keywords, TOKEN_BUDGET)
+    print(
+        f"{result.tokens_before} tokens trimmed to {result.tokens_after} "
+        f"(budget {TOKEN_BUDGET})"
+    )
+
+    for name, line in EXPECTED.items():
+        assert line in result.text, f"Lost the {name}: {line!r}"
+    for name, line in UNEXPECTED.items():
+        assert line not in result.text, f"Kept the {name} text: {line!r}"
+    print("Responsibilities and requirements kept")
+
+
+if __name__ == "__main__":
+    main()
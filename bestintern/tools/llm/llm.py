@@ -1,17 +1,43 @@
 """Talk to LLMs."""
 
+import asyncio
 from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 # import weave
-from litellm import completion, embedding
+from litellm import acompletion, completion, completion_cost, embedding
 from pydantic import BaseModel
 
+from bestintern.tools.llm.preprocess import count_tokens
+from bestintern.tools.llm.ratelimit import RateLimitScheduler, shared_scheduler
+from bestintern.utils.logger import setup_logger
+from bestintern.utils.metrics import LLM_COST, LLM_TOKENS, is_enabled, span
+from config.constants import (
+    EMBEDDING_BATCH_SIZE,
+    ESTIMATED_COMPLETION_TOKENS,
+    LLM_RETRY_BACKOFF,
+)
+
+logger = setup_logger(__name__)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts and provider-side failures; not bad requests."""
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and (
+        status_code in (408, 429) or status_code >= 500
+    )
+
 
 class LiteLLMModels(Enum):
     gemini = "gemini/gemini-pro"  # requires GEMINI_API_KEY
     gemini_flash = "gemini/gemini-1.5-flash"  # requires GEMINI_API_KEY
 
 
+class LiteLLMEmbeddingModels(Enum):
+    gemini = "gemini/text-embedding-004"  # requires GEMINI_API_KEY
+
+
 class LiteLLMConfig(BaseModel):
     model: LiteLLMModels
 
@@ -20,30 +46,140 @@ class LiteLLMResponse(BaseModel):
     content: str
 
 
+def _record_usage(model: str, response: Any) -> None:
+    """Record a call's prompt and completion tokens and its cost."""
+    if not is_enabled():
+        return
+    usage = getattr(response, "usage", None)
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if tokens:
+            LLM_TOKENS.observe(tokens, model=model, kind=kind)
+    try:
+        cost = completion_cost(completion_response=response)
+    except Exception:  # pylint: disable=broad-exception-caught
+        # Models missing from litellm's price list have no cost
+        return
+    LLM_COST.inc(cost, model=model)
+
+
 class LiteLLM:
     # weave.init("bestintern")
 
     def __init__(
-        self, model: LiteLLMModels, system_prompt: str = "", num_retries: int = 0
+        self,
+        model: LiteLLMModels,
+        system_prompt: str = "",
+        num_retries: int = 0,
+        scheduler: RateLimitScheduler = shared_scheduler,
+        acompletion_fn: Callable[..., Awaitable[Any]] = acompletion,
     ) -> None:
         self.model = model.value
         self.system_prompt = system_prompt
         self.num_retries = num_retries
+        self.scheduler = scheduler
+        self.acompletion_fn = acompletion_fn
 
-    # @weave.op()
-    def askllm(
-        self, query: str, overwrite_system_prompt: str = None
-    ) -> LiteLLMResponse:
-
+    def _build_messages(
+        self, query: str, overwrite_system_prompt: Optional[str] = None
+    ) -> List[Dict[str, str]]:
         messages = []
 
         system_prompt = overwrite_system_prompt or self.system_prompt
         messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": query})
+        return messages
 
-        response = completion(
-            model=self.model, messages=messages, num_retries=self.num_retries
-        )
+    # @weave.op()
+    def askllm(
+        self, query: str, overwrite_system_prompt: str = None
+    ) -> LiteLLMResponse:
+
+        messages = self._build_messages(query, overwrite_system_prompt)
+
+        with span("llm_call"):
+            response = completion(
+                model=self.model, messages=messages, num_retries=self.num_retries
+            )
+        _record_usage(self.model, response)
 
         llmresponse = LiteLLMResponse(content=response.choices[0].message.content)
         return llmresponse
+
+    async def askllm_async(
+        self, query: str, overwrite_system_prompt: str = None
+    ) -> LiteLLMResponse:
+        """
+        Ask the LLM without blocking the event loop.
+
+        Requests wait their turn in the scheduler until they fit the model's
+        requests-per-minute and tokens-per-minute budgets. The token cost is
+        estimated up front and corrected from the usage the provider reports.
+
+        Failed calls are retried here rather than by litellm, so every retry
+        waits for the limiter too. A 429 empties the request budget first;
+        other provider errors back off exponentially.
+        """
+        messages = self._build_messages(query, overwrite_system_prompt)
+        estimated_tokens = (
+            sum(count_tokens(message["content"]) for message in messages)
+            + ESTIMATED_COMPLETION_TOKENS
+        )
+
+        limiter = self.scheduler.limiter(self.model)
+        for attempt in range(self.num_retries + 1):
+            await limiter.acquire(estimated_tokens)
+            try:
+                with span("llm_call"):
+                    response = await self.acompletion_fn(
+                        model=self.model, messages=messages, num_retries=0
+                    )
+                break
+            except Exception as e:
+                if getattr(e, "status_code", None) == 429:
+                    limiter.penalize()
+                if attempt == self.num_retries or not _is_retryable(e):
+                    raise
+                logger.warning(
+                    "LLM call to %s failed, retrying (%d/%d): %s",
+                    self.model,
+                    attempt + 1,
+                    self.num_retries,
+                    e,
+                )
+                if getattr(e, "status_code", None) != 429:
+                    await asyncio.sleep(LLM_RETRY_BACKOFF * 2**attempt)
+
+        usage = getattr(response, "usage", None)
+        if usage and getattr(usage, "total_tokens", None):
+            limiter.reconcile(estimated_tokens, usage.total_tokens)
+        _record_usage(self.model, response)
+
+        return LiteLLMResponse(content=response.choices[0].message.content)
+
+
+class LiteLLMEmbedder:
+    def __init__(
+        self,
+        model: LiteLLMEmbeddingModels,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        num_retries: int = 0,
+    ) -> None:
+        self.model = model.value
+        self.batch_size = batch_size
+        self.num_retries = num_retries
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, sending up to `batch_size` of them per request."""
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = embedding(
+                model=self.model,
+                input=texts[start : start + self.batch_size],
+                num_retries=self.num_retries,
+            )
+            for item in response.data:
+                vectors.append(
+                    item["embedding"] if isinstance(item, dict) else item.embedding
+                )
+        return vectors
@@ -1,79 +1,599 @@
 """Organize unordered text into Pydantic Models."""
 
+import hashlib
+import json
 import os
-from typing import Any, Dict, List, Type, TypeVar
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Type, TypeVar
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError, create_model
 
 from bestintern.tools.llm.llm import LiteLLM, LiteLLMModels
+from bestintern.tools.llm.preprocess import (
+    PreprocessResult,
+    count_tokens,
+    keywords_from_schema,
+    preprocess_text,
+)
+from bestintern.utils import sqlite
+from bestintern.utils.logger import setup_logger
+from bestintern.utils.metrics import EXTRACTION_RETRIES, EXTRACTIONS, span
 from bestintern.utils.utils import (
     clean_json_structure,
     load_jinja_template,
     parse_llm_response,
+    parse_llm_response_array,
 )
 
 T = TypeVar("T", bound=BaseModel)
 
-from config.constants import MAX_ATTEMPTS
+from config.constants import (
+    BATCH_ITEM_TOKENS,
+    BATCH_MAX_DOCUMENTS,
+    DEFAULT_TOKEN_BUDGET,
+    EXTRACTION_CACHE_MAX_ENTRIES,
+    EXTRACTION_CACHE_PATH,
+    MAX_ATTEMPTS,
+    MODEL_TOKEN_BUDGETS,
+)
+
+logger = setup_logger(__name__)
+
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 class LLMDataExtracted(BaseModel):
     data: T
     not_found: list
+    # Set when the LLM failed and only rule-based known fields were kept
+    llm_failed: bool = False
+
+
+def _record_extraction(
+    model_class: Type[T], outcome: str, retries: Optional[int] = None
+) -> None:
+    """Count an extraction's outcome (llm, cached, failed) and its retries."""
+    EXTRACTIONS.inc(schema=model_class.__name__, outcome=outcome)
+    if retries is not None:
+        EXTRACTION_RETRIES.observe(retries, schema=model_class.__name__)
+
+
+class ExtractionPlan:
+    """
+    Prompt and validation machinery for one model class, built once.
+
+    Holds the JSON schema, the rendered field spec, the compiled prompt
+    template, a pydantic validator, the field names used for missing-field
+    detection and the schema keywords used to rank text when preprocessing.
+    Get plans through `get_extraction_plan` so they are shared.
+    """
+
+    def __init__(self, model_class: Type[T]):
+        self.model_class = model_class
+        self.schema: Dict[str, Any] = model_class.model_json_schema()
+        self.fields_info = str(clean_json_structure(self.schema))
+        self.template = load_jinja_template("extract_data.j2", TEMPLATE_DIR)
+        self.batch_template = load_jinja_template("extract_batch.j2", TEMPLATE_DIR)
+        self.validator = TypeAdapter(model_class)
+        self.fields: FrozenSet[str] = frozenset(self.schema["properties"])
+        self.keywords: FrozenSet[str] = keywords_from_schema(self.schema)
+
+    def render(self, text: str) -> str:
+        """Render the extraction prompt for `text`."""
+        return self.template.render(fields_info=self.fields_info, text=text)
+
+    def render_batch(self, documents: List[str]) -> str:
+        """Render one prompt extracting every document in `documents`."""
+        return self.batch_template.render(
+            fields_info=self.fields_info, documents=documents
+        )
+
+    def validate(self, data: Any) -> T:
+        """Validate parsed LLM output into the model class."""
+        return self.validator.validate_python(data)
+
+
+@lru_cache(maxsize=None)
+def get_extraction_plan(model_class: Type[T]) -> ExtractionPlan:
+    """Return the shared extraction plan for `model_class`."""
+    return ExtractionPlan(model_class)
+
+
+@lru_cache(maxsize=None)
+def get_partial_model(model_class: Type[T], known_fields: FrozenSet[str]) -> Type[T]:
+    """
+    `model_class` without `known_fields`, for asking the LLM only for the
+    fields that were not already found some other way. Shared per field set,
+    so its extraction plan is too.
+    """
+    return create_model(
+        f"{model_class.__name__}Remaining",
+        __doc__=model_class.__doc__,
+        **{
+            name: (field.annotation, field)
+            for name, field in model_class.model_fields.items()
+            if name not in known_fields
+        },
+    )
+
+
+class ExtractionCache:
+    """
+    Disk-backed cache of extraction results, safe to share between processes.
+
+    Entries are keyed by a hash of everything that determines the LLM's answer
+    (model, whitespace-normalized prompt and target schema) and evicted least
+    recently used once there are more than `max_entries`.
+    """
+
+    def __init__(
+        self,
+        path: str = EXTRACTION_CACHE_PATH,
+        max_entries: int = EXTRACTION_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        sqlite.create(
+            path,
+            (
+                "CREATE TABLE IF NOT EXISTS extractions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)",
+                "CREATE INDEX IF NOT EXISTS extractions_last_used "
+                "ON extractions (last_used)",
+            ),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite.connect(self.path)
+
+    @staticmethod
+    def make_key(model: str, prompt: str, schema: Dict[str, Any]) -> str:
+        """Hash the inputs that determine an extraction result."""
+        normalized_prompt = " ".join(prompt.split())
+        payload = json.dumps([model, normalized_prompt, schema], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, model_class: Type[T]) -> Optional[LLMDataExtracted]:
+        """Return the cached extraction for `key`, if any."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE extractions SET last_used = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+        if row is None:
+            self.misses += 1
+            return None
+
+        try:
+            value = json.loads(row[0])
+            extracted = LLMDataExtracted(
+                data=model_class.model_validate(value["data"]),
+                not_found=value["not_found"],
+            )
+        except (ValidationError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return extracted
+
+    def put(self, key: str, extracted: LLMDataExtracted) -> None:
+        """Store an extraction and evict the least recently used overflow."""
+        value = json.dumps(
+            {
+                "data": extracted.data.model_dump(mode="json"),
+                "not_found": extracted.not_found,
+            }
+        )
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, value, last_used) "
+                "VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            conn.execute(
+                "DELETE FROM extractions WHERE key IN ("
+                "SELECT key FROM extractions ORDER BY last_used DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters for this instance and the entry count."""
+        with self._connect() as conn:
+            (entries,) = conn.execute("SELECT COUNT(*) FROM extractions").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
 
 
 class LLMDataExtractor:
-    def __init__(self, model: LiteLLMModels, max_retries: int = MAX_ATTEMPTS):
+    def __init__(
+        self,
+        model: LiteLLMModels,
+        max_retries: int = MAX_ATTEMPTS,
+        cache: Optional[ExtractionCache] = None,
+        token_budget: Optional[int] = None,
+    ):
         self.llm = LiteLLM(model=model, num_retries=max_retries)
+        self.cache = cache
+        self.token_budget = token_budget or MODEL_TOKEN_BUDGETS.get(
+            model.value, DEFAULT_TOKEN_BUDGET
+        )
+        self.last_preprocess: Optional[PreprocessResult] = None
 
     def extract_data(
-        self, text: str, model_class: Type[T], preprocess: bool = False
+        self,
+        text: str,
+        model_class: Type[T],
+        preprocess: bool = False,
+        known_fields: Optional[Dict[str, Any]] = None,
     ) -> LLMDataExtracted:
-        if preprocess:
-            text = self._preprocess_text(text, model_class)
+        """
+        Extract `model_class` from `text`.
 
-        prompt = self._generate_prompt(text, model_class)
+        Fields in `known_fields` (e.g. found by rules) are left out of the
+        schema sent to the LLM and merged into its answer. If the LLM fails,
+        the known fields are still returned, with the rest marked not found.
+        """
+        known_fields = self._known_fields(known_fields)
+        if known_fields:
+            return self._merge_known(
+                model_class,
+                known_fields,
+                self._extract_remaining(text, model_class, known_fields, preprocess),
+            )
 
+        prompt, cache_key, cached = self._prepare_extraction(
+            text, model_class, preprocess
+        )
+        if cached:
+            return cached
+        return self._ask_llm(prompt, model_class, cache_key)
+
+    async def extract_data_async(
+        self,
+        text: str,
+        model_class: Type[T],
+        preprocess: bool = False,
+        known_fields: Optional[Dict[str, Any]] = None,
+    ) -> LLMDataExtracted:
+        """Same as `extract_data`, using the rate-limited async LLM client."""
+        known_fields = self._known_fields(known_fields)
+        if known_fields:
+            return self._merge_known(
+                model_class,
+                known_fields,
+                await self._extract_remaining_async(
+                    text, model_class, known_fields, preprocess
+                ),
+            )
+
+        prompt, cache_key, cached = self._prepare_extraction(
+            text, model_class, preprocess
+        )
+        if cached:
+            return cached
+        return await self._ask_llm_async(prompt, model_class, cache_key)
+
+    def _ask_llm(
+        self, prompt: str, model_class: Type[T], cache_key: Optional[str]
+    ) -> LLMDataExtracted:
+        """Extract with the LLM, retrying invalid answers; no cache lookup."""
         for attempt in range(MAX_ATTEMPTS):
             try:
                 response = self.llm.askllm(prompt)
-                data = parse_llm_response(response.content)
-                extracted_data = model_class(**data)
-                missing_fields = self._get_missing_fields(data, model_class)
-                return LLMDataExtracted(data=extracted_data, not_found=missing_fields)
+                extracted = self._finish_extraction(
+                    response.content, model_class, cache_key
+                )
             except (ValidationError, ValueError) as e:
-                if attempt == MAX_ATTEMPTS - 1:
-                    raise ValueError(
-                        f"Failed to extract valid data after {MAX_ATTEMPTS} attempts: "
-                        f"{str(e)}"
-                    ) from e
-
-                error_prompt = (
-                    f"The previous attempt failed due to: {str(e)}. "
-                    "Please try again, ensuring all required fields are filled "
-                    "and the format is correct. Provide only the JSON object, "
-                    "without any additional text before or after it."
+                prompt = self._retry_prompt(prompt, e, attempt, model_class)
+            else:
+                _record_extraction(model_class, "llm", attempt)
+                return extracted
+
+        raise ValueError("Unexpected error in data extraction process")
+
+    async def _ask_llm_async(
+        self, prompt: str, model_class: Type[T], cache_key: Optional[str]
+    ) -> LLMDataExtracted:
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                response = await self.llm.askllm_async(prompt)
+                extracted = self._finish_extraction(
+                    response.content, model_class, cache_key
                 )
-                prompt += f"\n\n{error_prompt}"
+            except (ValidationError, ValueError) as e:
+                prompt = self._retry_prompt(prompt, e, attempt, model_class)
+            else:
+                _record_extraction(model_class, "llm", attempt)
+                return extracted
 
         raise ValueError("Unexpected error in data extraction process")
 
+    @staticmethod
+    def _known_fields(known_fields: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            name: value
+            for name, value in (known_fields or {}).items()
+            if value not in (None, "", [], {})
+        }
+
+    def _extract_remaining(
+        self,
+        text: str,
+        model_class: Type[T],
+        known_fields: Dict[str, Any],
+        preprocess: bool,
+    ) -> Optional[LLMDataExtracted]:
+        """Ask the LLM for the fields not in `known_fields`; None if it fails."""
+        if get_extraction_plan(model_class).fields <= known_fields.keys():
+            return None
+        partial_model = get_partial_model(model_class, frozenset(known_fields))
+        try:
+            return self.extract_data(text, partial_model, preprocess=preprocess)
+        except ValueError as e:
+            logger.warning(
+                "LLM extraction failed, keeping %d rule-based fields of %s: %s",
+                len(known_fields),
+                model_class.__name__,
+                e,
+            )
+            return None
+
+    async def _extract_remaining_async(
+        self,
+        text: str,
+        model_class: Type[T],
+        known_fields: Dict[str, Any],
+        preprocess: bool,
+    ) -> Optional[LLMDataExtracted]:
+        if get_extraction_plan(model_class).fields <= known_fields.keys():
+            return None
+        partial_model = get_partial_model(model_class, frozenset(known_fields))
+        try:
+            return await self.extract_data_async(
+                text, partial_model, preprocess=preprocess
+            )
+        except ValueError as e:
+            logger.warning(
+                "LLM extraction failed, keeping %d rule-based fields of %s: %s",
+                len(known_fields),
+                model_class.__name__,
+                e,
+            )
+            return None
+
+    def _merge_known(
+        self,
+        model_class: Type[T],
+        known_fields: Dict[str, Any],
+        remaining: Optional[LLMDataExtracted],
+    ) -> LLMDataExtracted:
+        """Combine the LLM's partial extraction with the known fields."""
+        fields = get_extraction_plan(model_class).fields
+        if remaining is None:
+            data = dict.fromkeys(fields)
+            not_found = sorted(fields - known_fields.keys())
+        else:
+            data = remaining.data.model_dump()
+            not_found = remaining.not_found
+        data.update((name, known_fields[name]) for name in fields & known_fields.keys())
+        return LLMDataExtracted(
+            data=get_extraction_plan(model_class).validate(data),
+            not_found=not_found,
+            # No remaining extraction although fields were left: the LLM failed
+            llm_failed=remaining is None and bool(not_found),
+        )
+
+    def _prepare_extraction(
+        self, text: str, model_class: Type[T], preprocess: bool
+    ) -> Tuple[str, Optional[str], Optional[LLMDataExtracted]]:
+        """Build the prompt and its cache key, returning any cached result."""
+        if preprocess:
+            text = self._preprocess_text(text, model_class)
+
+        plan = get_extraction_plan(model_class)
+        with span("prompt_render"):
+            prompt = plan.render(text)
+
+        if not self.cache:
+            return prompt, None, None
+        cache_key = self.cache.make_key(self.llm.model, prompt, plan.schema)
+        cached = self.cache.get(cache_key, model_class)
+        if cached:
+            _record_extraction(model_class, "cached")
+        return prompt, cache_key, cached
+
+    def _finish_extraction(
+        self, content: str, model_class: Type[T], cache_key: Optional[str]
+    ) -> LLMDataExtracted:
+        """Validate an LLM response and cache the result."""
+        with span("validate"):
+            data = parse_llm_response(content)
+            extracted_data = get_extraction_plan(model_class).validate(data)
+            missing_fields = self._get_missing_fields(data, model_class)
+        extracted = LLMDataExtracted(data=extracted_data, not_found=missing_fields)
+        if self.cache:
+            self.cache.put(cache_key, extracted)
+        return extracted
+
+    def _retry_prompt(
+        self, prompt: str, error: Exception, attempt: int, model_class: Type[T]
+    ) -> str:
+        """Append the failure to the prompt, or give up after the last attempt."""
+        if attempt == MAX_ATTEMPTS - 1:
+            _record_extraction(model_class, "failed", attempt)
+            raise ValueError(
+                f"Failed to extract valid data after {MAX_ATTEMPTS} attempts: "
+                f"{str(error)}"
+            ) from error
+
+        error_prompt = (
+            f"The previous attempt failed due to: {str(error)}. "
+            "Please try again, ensuring all required fields are filled "
+            "and the format is correct. Provide only the JSON object, "
+            "without any additional text before or after it."
+        )
+        return prompt + f"\n\n{error_prompt}"
+
+    def extract_data_batch(
+        self,
+        texts: List[str],
+        model_class: Type[T],
+        preprocess: bool = False,
+        max_documents: int = BATCH_MAX_DOCUMENTS,
+    ) -> List[Optional[LLMDataExtracted]]:
+        """
+        Extract many documents, packing several into each LLM call.
+
+        Documents are packed into prompts of up to `max_documents` documents
+        and the extractor's token budget. The model answers with a JSON array
+        that is validated item by item; only items that are missing or fail
+        validation are retried individually, without another cache lookup.
+        Results are returned in input order, with None for documents that
+        could not be extracted.
+        """
+        plan = get_extraction_plan(model_class)
+        results: List[Optional[LLMDataExtracted]] = [None] * len(texts)
+        cache_keys: Dict[int, str] = {}
+        pending: List[int] = []
+
+        if preprocess:
+            texts = [self._preprocess_text(text, model_class) for text in texts]
+
+        for index, text in enumerate(texts):
+            if self.cache:
+                cache_keys[index] = self.cache.make_key(
+                    self.llm.model, plan.render(text), plan.schema
+                )
+                results[index] = self.cache.get(cache_keys[index], model_class)
+            if results[index] is None:
+                pending.append(index)
+            else:
+                _record_extraction(model_class, "cached")
+
+        retry: List[int] = []
+        for batch in self._pack_batches(texts, pending, max_documents, model_class):
+            if len(batch) == 1:
+                retry.extend(batch)
+                continue
+
+            prompt = plan.render_batch([texts[index] for index in batch])
+            try:
+                items = parse_llm_response_array(self.llm.askllm(prompt).content)
+            except ValueError as e:
+                logger.warning("Batch of %d documents failed: %s", len(batch), e)
+                retry.extend(batch)
+                continue
+
+            extracted = self._validate_batch_items(items, len(batch), model_class)
+            for position, index in enumerate(batch):
+                results[index] = extracted.get(position)
+                if results[index] is None:
+                    retry.append(index)
+                    continue
+                _record_extraction(model_class, "llm", 0)
+                if self.cache:
+                    self.cache.put(cache_keys[index], results[index])
+
+        for index in retry:
+            try:
+                results[index] = self._ask_llm(
+                    plan.render(texts[index]), model_class, cache_keys.get(index)
+                )
+            except ValueError as e:
+                logger.error("Failed to extract document %d: %s", index, e)
+
+        return results
+
+    def _pack_batches(
+        self,
+        texts: List[str],
+        indices: List[int],
+        max_documents: int,
+        model_class: Type[T],
+    ) -> List[List[int]]:
+        """
+        Greedily group documents so each prompt, with the answer it asks for,
+        stays within the token budget.
+        """
+        plan = get_extraction_plan(model_class)
+        # Instructions and schema are sent once per prompt; each document adds
+        # its header and, in the answer, an object of `BATCH_ITEM_TOKENS`
+        overhead = count_tokens(plan.render_batch([]))
+        per_document = (
+            count_tokens(plan.render_batch([""])) - overhead + BATCH_ITEM_TOKENS
+        )
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        batch_tokens = overhead
+        for index in indices:
+            tokens = count_tokens(texts[index]) + per_document
+            if batch and (
+                len(batch) >= max_documents or batch_tokens + tokens > self.token_budget
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], overhead
+            batch.append(index)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _validate_batch_items(
+        self, items: List[Any], batch_size: int, model_class: Type[T]
+    ) -> Dict[int, LLMDataExtracted]:
+        """Validate each array item, keyed by the document it belongs to."""
+        plan = get_extraction_plan(model_class)
+        extracted: Dict[int, LLMDataExtracted] = {}
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            document_id = item.pop("document_id", position)
+            if not isinstance(document_id, int) or not 0 <= document_id < batch_size:
+                continue
+            try:
+                data = plan.validate(item)
+            except ValidationError:
+                continue
+            extracted[document_id] = LLMDataExtracted(
+                data=data, not_found=self._get_missing_fields(item, model_class)
+            )
+        return extracted
+
     def _preprocess_text(self, text: str, model_class: Type[T]) -> str:
-        """Organizes data from the text in more readable formatting using model_class"""
-        raise NotImplementedError("this funtion is yet to be implemented")
+        """
+        Strips boilerplate from the text and trims it to the model's token budget,
+        keeping the sections most relevant to model_class.
+        """
+        plan = get_extraction_plan(model_class)
+        with span("preprocess"):
+            result = preprocess_text(text, plan.keywords, self.token_budget)
+        self.last_preprocess = result
+        logger.info(
+            "Preprocessed text for %s: %d -> %d tokens (%d saved)",
+            model_class.__name__,
+            result.tokens_before,
+            result.tokens_after,
+            result.tokens_saved,
+        )
+        return result.text
 
     def _generate_prompt(self, text: str, model_class: Type[T]) -> str:
-        schema = model_class.model_json_schema()
-        fields_info = clean_json_structure(schema)
-        template_dir = os.path.dirname(os.path.abspath(__file__))
-        template = load_jinja_template("extract_data.j2", template_dir)
-        return template.render(fields_info=fields_info, text=text)
+        return get_extraction_plan(model_class).render(text)
 
     def _get_missing_fields(
         self, data: Dict[str, Any], model_class: Type[T]
     ) -> List[str]:
-        schema = model_class.model_json_schema()
-        all_fields = set(schema["properties"].keys())
+        all_fields = get_extraction_plan(model_class).fields
         provided_fields = {k for k, v in data.items() if v not in (None, "", [], {})}
         missing_fields = list(all_fields - provided_fields)
         return missing_fields
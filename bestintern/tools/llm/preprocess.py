@@ -0,0 +1,251 @@
+"""Shrink scraped text to a token budget before it is sent to an LLM."""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+import tiktoken
+from pydantic import BaseModel
+
+from bestintern.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Headings after which a job page only lists other postings
+_TRAILING_SECTION = re.compile(
+    r"^(?:similar|related|recommended|other|more|suggested)\s+(?:jobs|positions|"
+    r"roles|openings|internships)\b|^(?:jobs\s+)?you\s+may\s+(?:also\s+)?like\b|"
+    r"^people\s+(?:also\s+)?viewed\b",
+    re.IGNORECASE,
+)
+
+# Whole lines that are site chrome rather than the posting: links such as
+# "Privacy Policy" or "Sign in", alone or joined by separators, and copyright
+# footers. Sentences that merely mention these words are kept.
+_CHROME = (
+    r"privacy(?:\s+(?:policy|notice|statement))?|"
+    r"terms(?:\s+(?:of\s+(?:use|service)|(?:and|&)\s+conditions))?|"
+    r"cookies?(?:\s+(?:policy|settings|preferences))?|"
+    r"(?:accept|reject)\s+(?:all\s+)?cookies|sign\s*(?:in|up|out)|log\s*(?:in|out)|"
+    r"create\s+(?:an\s+)?account|skip\s+to\s+(?:main\s+)?content|sitemap|"
+    r"follow\s+us|share(?:\s+(?:this\s+job|on\s+\w+))?|"
+    r"back\s+to\s+(?:search|results|jobs)|save(?:\s+this)?\s+job|job\s+alerts?"
+)
+_BOILERPLATE = re.compile(
+    rf"^(?:{_CHROME})(?:\s*[|·•/]\s*(?:{_CHROME}))*\s*[.!]?$"
+    r"|^(?:©|copyright\b)|\ball\s+rights\s+reserved\.?$",
+    re.IGNORECASE,
+)
+_BOILERPLATE_MAX_LENGTH = 120
+# Shorter lines may repeat for a reason ("Python" under required and preferred
+# skills); only longer ones, or a line right after itself, are dropped as copies
+_REPEAT_MIN_LENGTH = 80
+
+_WORD = re.compile(r"[a-z][a-z+#\-]{2,}")
+# Words of schema names and descriptions that say nothing about where a field
+# is found; "the" and "for" would otherwise favour any long prose section
+_STOPWORDS = frozenset(
+    "about all and any are but can each for from has have how its list name "
+    "not one only short specified that the their this type very was "
+    "wanted what when where whether which who will with you your our".split()
+)
+# Words that mark the text a field is extracted from, by a word of its name
+_FIELD_SYNONYMS = {
+    "application": "apply applications applicants",
+    "benefits": "equity insurance health dental vision 401k pto vacation perks",
+    "citizen": "citizenship citizens clearance",
+    "deadline": "apply closing",
+    "description": "responsibilities duties role doing design implement develop "
+    "build",
+    "education": "degree bachelor master phd university college major "
+    "graduate student",
+    "experience": "years background worked",
+    "job": "internship intern position role",
+    "location": "office hybrid onsite on-site relocation",
+    "remote": "hybrid onsite on-site",
+    "requirements": "qualifications required need must preferred",
+    "salary": "pay compensation usd hourly annual",
+    "skills": "programming proficiency proficient familiarity knowledge "
+    "fundamentals",
+    "type": "full-time part-time internship contract temporary",
+    "visa": "sponsorship sponsor authorization authorized",
+}
+_HEADING_MAX_WORDS = 8
+_SECTION_MIN_CHARS = 200
+_SECTION_MAX_CHARS = 2000
+# Relevance added to a section whose heading names a field ("Responsibilities",
+# "What We Need To See"): its prose is what the field is extracted from, even
+# when it repeats few keywords itself
+_HEADING_BONUS = 0.1
+
+# Approximate characters per token when no tokenizer is available
+_CHARS_PER_TOKEN = 4
+
+
+class PreprocessResult(BaseModel):
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+@lru_cache(maxsize=None)
+def _get_encoding() -> Optional[tiktoken.Encoding]:
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("Tokenizer unavailable, estimating token counts: %s", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in `text`, close enough to budget any of our models."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // _CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def keywords_from_schema(schema: dict) -> frozenset:
+    """
+    Collect the words in field names and descriptions of a JSON schema, less
+    stopwords, plus the synonyms of each field name's words.
+    """
+    words = set()
+
+    def collect(properties: dict) -> None:
+        for name, value in properties.items():
+            name_words = _WORD.findall(name.replace("_", " ").lower())
+            words.update(name_words)
+            words.update(_WORD.findall(value.get("description", "").lower()))
+            for word in name_words:
+                words.update(_FIELD_SYNONYMS.get(word, "").split())
+
+    collect(schema.get("properties", {}))
+    for definition in schema.get("$defs", {}).values():
+        collect(definition.get("properties", {}))
+    return frozenset(words - _STOPWORDS)
+
+
+def strip_boilerplate(text: str) -> List[str]:
+    """Drop site chrome, repeated lines and trailing lists of other jobs."""
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if line]
+
+    # Only trust a "similar jobs" heading once the posting itself is behind us
+    for index in range(len(lines) // 2, len(lines)):
+        if _TRAILING_SECTION.search(lines[index]):
+            lines = lines[:index]
+            break
+
+    kept = []
+    seen = set()
+    for line in lines:
+        if kept and line == kept[-1]:
+            continue
+        if len(line) >= _REPEAT_MIN_LENGTH:
+            if line in seen:
+                continue
+            seen.add(line)
+        if len(line) <= _BOILERPLATE_MAX_LENGTH and _BOILERPLATE.search(line):
+            continue
+        kept.append(line)
+    return kept
+
+
+def _is_heading(line: str) -> bool:
+    return line.endswith(":") or (
+        len(line.split()) <= _HEADING_MAX_WORDS and line[-1] not in ".,;!?"
+    )
+
+
+def _split_sections(lines: List[str]) -> List[str]:
+    """
+    Group lines into sections of a bounded size, starting new sections at
+    heading-like lines where possible.
+    """
+    sections: List[List[str]] = [[]]
+    size = 0
+    for line in lines:
+        if size >= _SECTION_MAX_CHARS or (
+            _is_heading(line) and size >= _SECTION_MIN_CHARS
+        ):
+            sections.append([])
+            size = 0
+        sections[-1].append(line)
+        size += len(line)
+    return ["\n".join(section) for section in sections if section]
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: max_tokens * _CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def select_relevant(
+    lines: List[str], keywords: Iterable[str], token_budget: int
+) -> str:
+    """
+    Keep the sections that mention the most schema keywords within the budget,
+    favouring those under a heading made of them.
+
+    Sections keep their original order. The best section that no longer fits
+    whole is truncated into whatever budget is left.
+    """
+    keywords = frozenset(keywords)
+    sections = _split_sections(lines)
+    costs = [count_tokens(section) for section in sections]
+
+    def relevance(index: int) -> float:
+        words = _WORD.findall(sections[index].lower())
+        hits = sum(1 for word in words if word in keywords)
+        heading = sections[index].split("\n", 1)[0]
+        heading_words = [
+            word for word in _WORD.findall(heading.lower()) if word not in _STOPWORDS
+        ]
+        # Short list items look like headings too; only count a heading that
+        # is mostly keywords
+        heading_hits = sum(1 for word in heading_words if word in keywords)
+        bonus = 0.0
+        if (
+            _is_heading(heading)
+            and heading_hits
+            and 2 * heading_hits >= len(heading_words)
+        ):
+            bonus = _HEADING_BONUS
+        # Favour keyword-dense sections, and earlier ones on ties
+        return hits / (len(words) + 1) + bonus - index * 1e-6
+
+    chosen = {}
+    remaining = token_budget
+    for index in sorted(range(len(sections)), key=relevance, reverse=True):
+        if costs[index] <= remaining:
+            chosen[index] = sections[index]
+            remaining -= costs[index]
+        elif remaining > 0:
+            chosen[index] = _truncate_to_tokens(sections[index], remaining)
+            remaining = 0
+    return "\n".join(chosen[index] for index in sorted(chosen))
+
+
+def preprocess_text(
+    text: str, keywords: Iterable[str], token_budget: int
+) -> PreprocessResult:
+    """Strip boilerplate from `text`, then trim it to `token_budget` tokens."""
+    tokens_before = count_tokens(text)
+    lines = strip_boilerplate(text)
+    cleaned = "\n".join(lines)
+    tokens_after = count_tokens(cleaned)
+
+    if tokens_after > token_budget:
+        cleaned = select_relevant(lines, keywords, token_budget)
+        tokens_after = count_tokens(cleaned)
+
+    return PreprocessResult(
+        text=cleaned, tokens_before=tokens_before, tokens_after=tokens_after
+    )
@@ -0,0 +1,114 @@
+"""Share provider request and token quotas between concurrent LLM calls."""
+
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from bestintern.utils.logger import setup_logger
+from config.constants import DEFAULT_RATE_LIMIT, MODEL_RATE_LIMITS
+
+logger = setup_logger(__name__)
+
+
+class TokenBucket:
+    """Bucket holding up to `capacity` units, refilled continuously."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.available = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(
+            self.capacity,
+            self.available + (now - self.updated) * self.refill_per_second,
+        )
+        self.updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing / self.refill_per_second)
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+    def drain(self) -> None:
+        self._refill()
+        self.available = min(self.available, 0.0)
+
+    def adjust(self, amount: float) -> None:
+        """Give back (positive) or take away (negative) units after the fact."""
+        self._refill()
+        self.available = min(self.capacity, self.available + amount)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budget for one model.
+
+    Callers wait in arrival order: the first waiter holds the queue until its
+    request fits both budgets, so large requests are not starved by a stream
+    of small ones.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _queue(self) -> asyncio.Lock:
+        # asyncio locks belong to one event loop; the limiter may outlive it
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request of about `tokens` tokens may be sent."""
+        async with self._queue():
+            while True:
+                delay = max(self.requests.delay_for(1), self.tokens.delay_for(tokens))
+                if delay == 0:
+                    self.requests.consume(1)
+                    self.tokens.consume(tokens)
+                    return
+                await asyncio.sleep(delay)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token budget once a response reports real usage."""
+        self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def penalize(self) -> None:
+        """Empty the request budget after the provider rejected a request."""
+        self.requests.drain()
+
+
+class RateLimitScheduler:
+    """
+    Hands out one `RateLimiter` per model, configured from `MODEL_RATE_LIMITS`.
+
+    Share a single scheduler between every client that talks to the same
+    provider account so their requests draw from the same budgets.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.limits = MODEL_RATE_LIMITS if limits is None else limits
+        self._limiters: Dict[str, RateLimiter] = {}
+
+    def limiter(self, model: str) -> RateLimiter:
+        if model not in self._limiters:
+            requests_per_minute, tokens_per_minute = self.limits.get(
+                model, DEFAULT_RATE_LIMIT
+            )
+            self._limiters[model] = RateLimiter(requests_per_minute, tokens_per_minute)
+        return self._limiters[model]
+
+
+shared_scheduler = RateLimitScheduler()
@@ -0,0 +1,153 @@
+"""
+Benchmark of PDFReader metadata extraction and repeated text search.
+
+Compares the previous extraction, which rescanned the text on every
+`extract_*` call, with `scan_metadata` and with the reader's cached result,
+and lowercasing every page on each `search_text` call with the cached
+lowercase pages and word index. Runs on "sample_resume.pdf" and on
+synthetic documents made of its text repeated. No LLM calls are made.
+
+Steps:
+- place a "sample_resume.pdf" resume in the same directory as this script
+- run `python -m bestintern.tools.pdf.example.benchmark`
+"""
+
+import os
+import re
+from timeit import timeit
+
+from bestintern.tools.pdf.reader import PDFReader, scan_metadata
+
+SEARCH_TERMS = ["experience", "python", "university", "project", "lead"]
+COMMON_WORDS = {"The", "And", "Or", "In", "On", "At", "To", "For", "With", "By"}
+COMMON_WORDS |= {"From", "Up", "About", "Into", "Over", "After"}
+EXTRACT_METHODS = [
+    "extract_emails",
+    "extract_phone_numbers",
+    "extract_location",
+    "extract_education",
+    "extract_work_experience",
+    "extract_skills",
+]
+
+
+def six_scans(text: str) -> dict:
+    """The previous extract_metadata: one regex scan per field."""
+    months = (
+        "January|February|March|April|May|June|July|"
+        "August|September|October|November|December"
+    )
+    emails = re.findall(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b", text)
+    phones = re.findall(
+        r"\b(?:\+?1[-.]?)?\(?[2-9][0-8][0-9]\)?[-.]?[2-9][0-9]{2}[-.]?[0-9]{4}\b", text
+    )
+    locations = re.findall(
+        r"\b(?:[A-Z][a-z]+(?:\s[A-Z][a-z]+)*,\s*[A-Z]{2}\s*\d{5}(?:-\d{4})?)\b", text
+    )
+    sections = re.split(
+        r"\b(?:degree|bachelor|master|phd|diploma|certificate)\b",
+        text,
+        flags=re.IGNORECASE,
+    )
+    education = [section.strip().split("\n")[0].strip() for section in sections[1:]]
+    experiences = re.findall(
+        rf"(\b(?:{months})\s\d{{4}}\s*-\s*(?:{months})\s\d{{4}}|\bPresent\b)"
+        r"\s*(.*?)(?=\n\n|\Z)",
+        text,
+        re.DOTALL,
+    )
+    skills = re.findall(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b", text)
+    return {
+        "emails": sorted(set(emails)),
+        "phone_numbers": sorted(set(phones)),
+        "locations": sorted(set(locations)),
+        "education": education,
+        "work_experience": [
+            {"period": period.strip(), "description": description.strip()}
+            for period, description in experiences
+        ],
+        "skills": sorted(set(skill for skill in skills if skill not in COMMON_WORDS)),
+    }
+
+
+def sorted_scan(text: str) -> dict:
+    metadata = scan_metadata(text)
+    for field in ("emails", "phone_numbers", "locations", "skills"):
+        metadata[field] = sorted(metadata[field])
+    return metadata
+
+
+def search_every_call(pages, term: str) -> list:
+    """The previous search_text: lowercase every page on each call."""
+    results = []
+    for page_num, page_text in enumerate(pages):
+        if term.lower() in page_text.lower():
+            index = page_text.lower().index(term.lower())
+            results.append((page_num + 1, page_text[max(0, index - 100) : index]))
+    return results
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    reader = PDFReader(os.path.join(script_dir, "sample_resume.pdf"))
+
+    print("extract_metadata")
+    for repeat in (1, 10, 100):
+        text = reader.text_content * repeat
+        assert sorted_scan(text) == six_scans(text)
+        number = max(1, 200 // repeat)
+        before = timeit(lambda: six_scans(text), number=number) / number
+        after = timeit(lambda: sorted_scan(text), number=number) / number
+        print(
+            f"  {len(text):>8} chars: {before * 1e3:.2f} ms before, "
+            f"{after * 1e3:.2f} ms scan_metadata ({before / after:.1f}x)"
+        )
+
+    print("extract_metadata and each extract_* method once")
+    for repeat in (1, 10, 100):
+        text = reader.text_content * repeat
+        number = max(1, 200 // repeat)
+        # Previously every extract_* call was its own scan
+        before = timeit(lambda: six_scans(text), number=number) / number * 2
+
+        def cached_reader():
+            cached = PDFReader.__new__(PDFReader)
+            cached.__dict__.update(reader.__dict__)
+            cached._text_content = text
+            cached._metadata = None
+            cached.extract_metadata()
+            for method in EXTRACT_METHODS:
+                getattr(cached, method)()
+
+        after = timeit(cached_reader, number=number) / number
+        print(
+            f"  {len(text):>8} chars: {before * 1e3:.2f} ms before, "
+            f"{after * 1e3:.2f} ms cached ({before / after:.1f}x)"
+        )
+
+    print("search_text, all terms")
+    for repeat in (1, 10, 100):
+        pages = reader.pages * repeat
+        cached = PDFReader.__new__(PDFReader)
+        cached.__dict__.update(reader.__dict__)
+        cached._page_texts = list(pages)
+        cached._lower_pages = None
+        cached._word_index = None
+        cached._search_cache = {}
+        number = 20
+        before = timeit(
+            lambda: [search_every_call(pages, term) for term in SEARCH_TERMS],
+            number=number,
+        )
+        after = timeit(
+            lambda: [cached.search_text(term) for term in SEARCH_TERMS],
+            number=number,
+        )
+        print(
+            f"  {len(pages):>4} pages: {before / number * 1e3:.2f} ms lowercasing, "
+            f"{after / number * 1e3:.2f} ms cached ({before / after:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
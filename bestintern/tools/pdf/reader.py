@@ -2,18 +2,159 @@
 
 import io
 import re
-from typing import Dict, List, Union
+from typing import BinaryIO, Dict, List, Optional, Set, Union
 
 import PyPDF2
 
+_MONTHS = (
+    "January|February|March|April|May|June|July|"
+    "August|September|October|November|December"
+)
+_EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b")
+_PHONE = re.compile(
+    r"\b(?:\+?1[-.]?)?\(?[2-9][0-8][0-9]\)?[-.]?[2-9][0-9]{2}[-.]?[0-9]{4}\b"
+)
+# Common location formats (City, State ZIP)
+_LOCATION = re.compile(
+    r"\b(?:[A-Z][a-z]+(?:\s[A-Z][a-z]+)*,\s*[A-Z]{2}\s*\d{5}(?:-\d{4})?)\b"
+)
+_EDUCATION = re.compile(
+    r"\b(?:degree|bachelor|master|phd|diploma|certificate)\b", re.IGNORECASE
+)
+# Start of a work experience entry: a date range or "Present"
+_PERIOD = re.compile(
+    rf"\b(?:{_MONTHS})\s\d{{4}}\s*-\s*(?:{_MONTHS})\s\d{{4}}|\bPresent\b"
+)
+_SKILL = re.compile(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b")
+_LEADING_WHITESPACE = re.compile(r"\s*")
+_SEARCH_WORD = re.compile(r"\w+")
+# Filter out common words that are likely not skills
+_COMMON_WORDS = frozenset(
+    [
+        "The",
+        "And",
+        "Or",
+        "In",
+        "On",
+        "At",
+        "To",
+        "For",
+        "With",
+        "By",
+        "From",
+        "Up",
+        "About",
+        "Into",
+        "Over",
+        "After",
+    ]
+)
+
+
+def scan_metadata(text: str) -> Dict[str, list]:
+    """
+    Find emails, phone numbers, locations, education, work experience and
+    skills in `text`.
+
+    Each field is one scan with a precompiled pattern. Education and work
+    experience are cut at keyword and blank-line positions rather than by
+    splitting the text or with a lookahead at every character.
+    """
+    # Text after each education keyword, up to the next one, first line only
+    keywords = list(_EDUCATION.finditer(text))
+    ends = [match.start() for match in keywords[1:]] + [len(text)]
+    education = [
+        text[keyword.end() : end].strip().split("\n")[0].strip()
+        for keyword, end in zip(keywords, ends)
+    ]
+
+    # Each period's description runs to the next blank line
+    work_experience = []
+    position = 0
+    while True:
+        period = _PERIOD.search(text, position)
+        if period is None:
+            break
+        description_start = _LEADING_WHITESPACE.match(text, period.end()).end()
+        description_end = text.find("\n\n", description_start)
+        if description_end == -1:
+            description_end = len(text)
+        work_experience.append(
+            {
+                "period": period.group().strip(),
+                "description": text[description_start:description_end].strip(),
+            }
+        )
+        position = description_end
+
+    return {
+        "emails": list(set(_EMAIL.findall(text))),
+        "phone_numbers": list(set(_PHONE.findall(text))),
+        "locations": list(set(_LOCATION.findall(text))),
+        "education": education,
+        "work_experience": work_experience,
+        "skills": list(set(_SKILL.findall(text)) - _COMMON_WORDS),
+    }
+
+
+class _MemoryStream(io.RawIOBase):
+    """Read-only, seekable stream over a buffer, without copying it."""
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        self._data = memoryview(data).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._data)
+        if offset < 0:
+            raise ValueError("Negative seek position")
+        self._position = offset
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        chunk = self._data[self._position : self._position + len(buffer)]
+        buffer[: len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
 
 class PDFReader:
-    def __init__(self, pdf_file):
+    """
+    Text and metadata of a PDF, read from a path, a binary stream or an
+    in-memory buffer (`bytes`, `bytearray`, `memoryview`).
+
+    Pages are extracted lazily, the first time their text is needed. With
+    `max_pages`, pages past the cap are never read, which bounds the time
+    and memory a long or hostile upload can cost.
+    """
+
+    def __init__(
+        self,
+        pdf_file: Union[str, BinaryIO, bytes, bytearray, memoryview],
+        max_pages: Optional[int] = None,
+    ):
         self.pdf_file = pdf_file
+        self.max_pages = max_pages
         self.pdf_reader = None
-        self.text_content = ""
-        self.pages = []
         self.file_handle = None
+        self._page_texts: List[Optional[str]] = []
+        self._text_content: Optional[str] = None
+        self._lower_pages: Optional[List[str]] = None
+        self._word_index: Optional[Dict[str, Set[int]]] = None
+        self._search_cache: Dict[str, List[Dict[str, Union[int, str]]]] = {}
+        self._metadata: Optional[Dict[str, list]] = None
         self.initialize_reader()
 
     def initialize_reader(self):
@@ -23,16 +164,22 @@ class PDFReader:
                 # If pdf_file is a file path
                 self.file_handle = open(self.pdf_file, "rb")
                 self.pdf_reader = PyPDF2.PdfReader(self.file_handle)
-            elif isinstance(self.pdf_file, io.BytesIO):
-                # If pdf_file is a BytesIO object
+            elif isinstance(self.pdf_file, (bytes, bytearray, memoryview)):
+                # If pdf_file is the PDF itself, read it in place
+                self.pdf_reader = PyPDF2.PdfReader(_MemoryStream(self.pdf_file))
+            elif hasattr(self.pdf_file, "read") and hasattr(self.pdf_file, "seek"):
+                # If pdf_file is a BytesIO or other binary file object
                 self.pdf_reader = PyPDF2.PdfReader(self.pdf_file)
             else:
                 raise ValueError(
-                    "Unsupported file type. Please provide a file path or "
-                    "BytesIO object."
+                    "Unsupported file type. Please provide a file path, bytes or "
+                    "a binary file object."
                 )
 
-            self.extract_all_text()
+            page_count = len(self.pdf_reader.pages)
+            if self.max_pages is not None:
+                page_count = min(page_count, self.max_pages)
+            self._page_texts = [None] * page_count
         except Exception as e:
             if self.file_handle:
                 self.file_handle.close()
@@ -40,17 +187,34 @@ class PDFReader:
                 f"Error initializing PDF reader: {str(e)}"
             ) from e
 
+    def _page_text(self, page_num: int) -> str:
+        """Extract a page's text on first access."""
+        if self._page_texts[page_num] is None:
+            try:
+                self._page_texts[page_num] = self.pdf_reader.pages[
+                    page_num
+                ].extract_text()
+            except Exception as e:
+                raise Exception(  # pylint: disable=broad-exception-raised
+                    f"Error extracting text from PDF: {str(e)}"
+                ) from e
+        return self._page_texts[page_num]
+
     def extract_all_text(self):
-        """Extract text from all pages of the PDF."""
-        try:
-            for page in self.pdf_reader.pages:
-                page_text = page.extract_text()
-                self.pages.append(page_text)
-                self.text_content += page_text + "\n"
-        except Exception as e:
-            raise Exception(  # pylint: disable=broad-exception-raised
-                f"Error extracting text from PDF: {str(e)}"
-            ) from e
+        """Extract text from all pages of the PDF (up to `max_pages`)."""
+        for page_num in range(len(self._page_texts)):
+            self._page_text(page_num)
+
+    @property
+    def pages(self) -> List[str]:
+        """Text of every page read (up to `max_pages`)."""
+        return [self._page_text(page_num) for page_num in range(len(self._page_texts))]
+
+    @property
+    def text_content(self) -> str:
+        if self._text_content is None:
+            self._text_content = "".join(page + "\n" for page in self.pages)
+        return self._text_content
 
     def get_full_text(self) -> str:
         """Return the full text content of the PDF."""
@@ -58,120 +222,112 @@ class PDFReader:
 
     def get_text_by_page(self, page_num: int) -> str:
         """Return the text content of a specific page."""
-        if 0 <= page_num < len(self.pages):
-            return self.pages[page_num].strip()
+        if 0 <= page_num < len(self._page_texts):
+            return self._page_text(page_num).strip()
         else:
-            raise ValueError(f"Invalid page number. Total pages: {len(self.pages)}")
+            raise ValueError(
+                f"Invalid page number. Total pages: {len(self._page_texts)}"
+            )
 
     def get_total_pages(self) -> int:
-        """Return the total number of pages in the PDF."""
-        return len(self.pages)
+        """Return the total number of pages in the PDF (up to `max_pages`)."""
+        return len(self._page_texts)
+
+    @property
+    def lower_pages(self) -> List[str]:
+        """Lowercased text of every page, computed once."""
+        if self._lower_pages is None:
+            self._lower_pages = [page.lower() for page in self.pages]
+        return self._lower_pages
+
+    def _candidate_pages(self, term: str) -> range:
+        """
+        Pages that may contain `term`. A term made of word characters only
+        can only occur inside a word, so only pages with a word containing it
+        are candidates; this is answered from a word -> pages index.
+        """
+        if not _SEARCH_WORD.fullmatch(term):
+            return range(len(self.lower_pages))
+        if self._word_index is None:
+            self._word_index = {}
+            for page_num, page_text in enumerate(self.lower_pages):
+                for word in set(_SEARCH_WORD.findall(page_text)):
+                    self._word_index.setdefault(word, set()).add(page_num)
+
+        pages = set(self._word_index.get(term, ()))
+        for word, word_pages in self._word_index.items():
+            if term in word:
+                pages |= word_pages
+        return sorted(pages)
 
     def search_text(self, search_term: str) -> List[Dict[str, Union[int, str]]]:
         """
         Search for a term in the PDF and return a list of occurrences with page numbers.
         """
-        results = []
-        for page_num, page_text in enumerate(self.pages):
-            if search_term.lower() in page_text.lower():
-                results.append(
-                    {
-                        "page": page_num + 1,
-                        "context": self.get_context(page_text, search_term),
-                    }
-                )
-        return results
+        term = search_term.lower()
+        if term not in self._search_cache:
+            results = []
+            for page_num in self._candidate_pages(term):
+                search_index = self.lower_pages[page_num].find(term)
+                if search_index != -1:
+                    results.append(
+                        {
+                            "page": page_num + 1,
+                            "context": self.get_context(
+                                self.pages[page_num],
+                                search_term,
+                                search_index=search_index,
+                            ),
+                        }
+                    )
+            self._search_cache[term] = results
+        return [dict(result) for result in self._search_cache[term]]
 
     def get_context(
-        self, text: str, search_term: str, context_length: int = 100
+        self,
+        text: str,
+        search_term: str,
+        context_length: int = 100,
+        search_index: Optional[int] = None,
     ) -> str:
-        """Helper method to get context around a search term."""
-        search_index = text.lower().index(search_term.lower())
+        """
+        Helper method to get context around a search term. Pass `search_index`
+        if the term's position in the lowercased text is already known.
+        """
+        if search_index is None:
+            search_index = text.lower().index(search_term.lower())
         start = max(0, search_index - context_length)
         end = min(len(text), search_index + len(search_term) + context_length)
         return text[start:end].strip()
 
+    def _scan_metadata(self) -> Dict[str, list]:
+        if self._metadata is None:
+            self._metadata = scan_metadata(self.text_content)
+        return self._metadata
+
     def extract_emails(self) -> List[str]:
         """Extract all email addresses from the PDF."""
-        email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-        return list(set(re.findall(email_pattern, self.text_content)))
+        return list(self._scan_metadata()["emails"])
 
     def extract_phone_numbers(self) -> List[str]:
         """Extract all phone numbers from the PDF."""
-        phone_pattern = (
-            r"\b(?:\+?1[-.]?)?\(?[2-9][0-8][0-9]\)?[-.]?[2-9][0-9]{2}[-.]?[0-9]{4}\b"
-        )
-        return list(set(re.findall(phone_pattern, self.text_content)))
+        return list(self._scan_metadata()["phone_numbers"])
 
     def extract_location(self) -> List[str]:
         """Extract potential location information from the PDF."""
-        # This pattern looks for common location formats (City, State ZIP)
-        location_pattern = (
-            r"\b(?:[A-Z][a-z]+(?:\s[A-Z][a-z]+)*,\s*[A-Z]{2}\s*\d{5}(?:-\d{4})?)\b"
-        )
-        return list(set(re.findall(location_pattern, self.text_content)))
+        return list(self._scan_metadata()["locations"])
 
     def extract_education(self) -> List[str]:
         """Extract education information from the PDF."""
-        education_keywords = r"\b(?:degree|bachelor|master|phd|diploma|certificate)\b"
-        education_sections = re.split(
-            education_keywords, self.text_content, flags=re.IGNORECASE
-        )
-        education_info = []
-        for section in education_sections[
-            1:
-        ]:  # Skip the first section as it's before any keyword
-            lines = section.strip().split("\n")
-            if lines:
-                education_info.append(
-                    lines[0].strip()
-                )  # Add the first line after each keyword
-        return education_info
+        return list(self._scan_metadata()["education"])
 
     def extract_work_experience(self) -> List[Dict[str, str]]:
         """Extract work experience information from the PDF."""
-        experience_pattern = (
-            r"(\b(?:January|February|March|April|May|June|July|"
-            r"August|September|October|November|December)\s\d{4}"
-            r"\s*-\s*(?:January|February|March|April|May|June|July|"
-            r"August|September|October|November|December)\s\d{4}|"
-            r"\bPresent\b)\s*(.*?)(?=\n\n|\Z)"
-        )
-        experiences = re.findall(experience_pattern, self.text_content, re.DOTALL)
-
-        return [
-            {"period": exp[0].strip(), "description": exp[1].strip()}
-            for exp in experiences
-        ]
+        return [dict(entry) for entry in self._scan_metadata()["work_experience"]]
 
     def extract_skills(self) -> List[str]:
         """Extract potential skills from the PDF."""
-        skill_pattern = r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b"
-        potential_skills = re.findall(skill_pattern, self.text_content)
-        # Filter out common words that are likely not skills
-        common_words = set(
-            [
-                "The",
-                "And",
-                "Or",
-                "In",
-                "On",
-                "At",
-                "To",
-                "For",
-                "With",
-                "By",
-                "From",
-                "Up",
-                "About",
-                "Into",
-                "Over",
-                "After",
-            ]
-        )
-        return list(
-            set(skill for skill in potential_skills if skill not in common_words)
-        )
+        return list(self._scan_metadata()["skills"])
 
     def extract_metadata(self) -> Dict[str, Union[List[str], List[Dict[str, str]]]]:
         """Extract all metadata from the PDF."""
@@ -0,0 +1,436 @@
+"""Read job postings from applicant-tracking system (ATS) APIs."""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from bestintern.tools.web.crawler import AsyncWebFetcher, FetchedPage
+from bestintern.tools.web.jsonld import job_posting_fields
+from bestintern.tools.web.reader import WebpageReader
+from bestintern.utils.logger import setup_logger
+from config.constants import ATS_BOARD_CACHE_TTL, CRAWL_MAX_CONCURRENCY, CRAWL_TIMEOUT
+
+logger = setup_logger(__name__)
+
+
+class ATSAdapter(ABC):
+    """
+    One applicant-tracking system: recognizes its job URLs, names the JSON
+    endpoint behind them, and maps that JSON onto a schema.org JobPosting.
+
+    `api_base` replaces the scheme and host of the endpoint, e.g. to read
+    recorded responses from a local server.
+    """
+
+    name: str = ""
+    # The endpoint serves many jobs (a whole board), so one response is
+    # fetched unconditionally and reused for every job on it
+    shared_endpoint: bool = False
+
+    def __init__(self, api_base: Optional[str] = None):
+        self.api_base = api_base.rstrip("/") if api_base else None
+
+    def _base(self, default: str) -> str:
+        return self.api_base or default
+
+    @abstractmethod
+    def api_url(self, url: str) -> Optional[str]:
+        """JSON endpoint for the job at `url`, or None if not this ATS's."""
+
+    @abstractmethod
+    def to_job_posting(self, data: Any, url: str) -> Optional[Dict]:
+        """The endpoint's JSON as a schema.org JobPosting, None if absent."""
+
+
+def _iso_date(value: Any) -> Optional[str]:
+    """ISO date from an ISO string or a milliseconds timestamp."""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc).date().isoformat()
+    if isinstance(value, str) and value:
+        return value[:10]
+    return None
+
+
+def _salary(
+    minimum: Any, maximum: Any, currency: Any, unit: Optional[str]
+) -> Optional[Dict]:
+    if minimum is None and maximum is None:
+        return None
+    return {
+        "@type": "MonetaryAmount",
+        "currency": currency,
+        "value": {
+            "@type": "QuantitativeValue",
+            "minValue": minimum if minimum is not None else maximum,
+            "maxValue": maximum,
+            "unitText": unit,
+        },
+    }
+
+
+class GreenhouseAdapter(ATSAdapter):
+    name = "greenhouse"
+    _HOST = re.compile(r"^(?:job-)?boards(?:\.eu)?\.greenhouse\.io$")
+    _PATH = re.compile(r"^/(?P<board>[^/]+)/jobs/(?P<job_id>\d+)")
+
+    def api_url(self, url: str) -> Optional[str]:
+        parts = urlsplit(url)
+        match = self._PATH.match(parts.path)
+        if not self._HOST.match(parts.netloc) or not match:
+            return None
+        base = self._base("https://boards-api.greenhouse.io")
+        return f"{base}/v1/boards/{match['board']}/jobs/{match['job_id']}"
+
+    def to_job_posting(self, data: Any, url: str) -> Optional[Dict]:
+        if not isinstance(data, dict) or not data.get("title"):
+            return None
+        return {
+            "@type": "JobPosting",
+            "title": data["title"],
+            "hiringOrganization": data.get("company_name"),
+            "jobLocation": {"address": (data.get("location") or {}).get("name")},
+            "description": data.get("content"),
+            "datePosted": data.get("first_published") or data.get("updated_at"),
+            "url": data.get("absolute_url"),
+        }
+
+
+class LeverAdapter(ATSAdapter):
+    name = "lever"
+    _PATH = re.compile(r"^/(?P<company>[^/]+)/(?P<job_id>[0-9a-f-]{36})")
+    _INTERVALS = {
+        "per-year-salary": "YEAR",
+        "per-month-salary": "MONTH",
+        "per-week-salary": "WEEK",
+        "per-day-wage": "DAY",
+        "per-hour-wage": "HOUR",
+    }
+
+    def api_url(self, url: str) -> Optional[str]:
+        parts = urlsplit(url)
+        match = self._PATH.match(parts.path)
+        if parts.netloc not in ("jobs.lever.co", "jobs.eu.lever.co") or not match:
+            return None
+        base = self._base("https://api.lever.co")
+        return f"{base}/v0/postings/{match['company']}/{match['job_id']}"
+
+    def to_job_posting(self, data: Any, url: str) -> Optional[Dict]:
+        if not isinstance(data, dict) or not data.get("text"):
+            return None
+        categories = data.get("categories") or {}
+        sections = [data.get("description") or ""]
+        for section in data.get("lists") or []:
+            heading, items = section.get("text", ""), section.get("content", "")
+            sections.append(f"<h3>{heading}</h3><ul>{items}</ul>")
+        sections.append(data.get("additional") or "")
+        salary = data.get("salaryRange") or {}
+        return {
+            "@type": "JobPosting",
+            "title": data["text"],
+            "jobLocation": [
+                {"address": location}
+                for location in categories.get("allLocations")
+                or [categories.get("location")]
+            ],
+            "employmentType": categories.get("commitment"),
+            "description": "".join(sections),
+            "datePosted": _iso_date(data.get("createdAt")),
+            "jobLocationType": (
+                "TELECOMMUTE" if data.get("workplaceType") == "remote" else None
+            ),
+            "baseSalary": _salary(
+                salary.get("min"),
+                salary.get("max"),
+                salary.get("currency"),
+                self._INTERVALS.get(salary.get("interval")),
+            ),
+            "url": data.get("hostedUrl"),
+        }
+
+
+class AshbyAdapter(ATSAdapter):
+    name = "ashby"
+    shared_endpoint = True
+    _PATH = re.compile(r"^/(?P<board>[^/]+)/(?P<job_id>[0-9a-f-]{36})")
+
+    def api_url(self, url: str) -> Optional[str]:
+        parts = urlsplit(url)
+        match = self._PATH.match(parts.path)
+        if parts.netloc != "jobs.ashbyhq.com" or not match:
+            return None
+        # The public API serves a whole job board; the job is picked from it
+        base = self._base("https://api.ashbyhq.com")
+        return f"{base}/posting-api/job-board/{match['board']}?includeCompensation=true"
+
+    def to_job_posting(self, data: Any, url: str) -> Optional[Dict]:
+        job_id = self._PATH.match(urlsplit(url).path)["job_id"]
+        jobs = (data.get("jobs") or []) if isinstance(data, dict) else []
+        job = next((job for job in jobs if job.get("id") == job_id), None)
+        if job is None:
+            return None
+
+        salary = None
+        compensation = job.get("compensation") or {}
+        for component in compensation.get("summaryComponents") or []:
+            if component.get("compensationType") == "Salary":
+                interval = (component.get("interval") or "").split()
+                salary = _salary(
+                    component.get("minValue"),
+                    component.get("maxValue"),
+                    component.get("currencyCode"),
+                    interval[-1] if interval else None,
+                )
+                break
+        locations = [job.get("location")] + [
+            location.get("location") for location in job.get("secondaryLocations") or []
+        ]
+        # "FullTime" -> "FULL_TIME", like schema.org
+        employment_type = re.sub(
+            r"(?<=[a-z])(?=[A-Z])", "_", job.get("employmentType") or ""
+        ).upper()
+        return {
+            "@type": "JobPosting",
+            "title": job.get("title"),
+            "jobLocation": [{"address": location} for location in locations],
+            "employmentType": employment_type or None,
+            "description": job.get("descriptionHtml") or job.get("descriptionPlain"),
+            "datePosted": _iso_date(job.get("publishedAt")),
+            "jobLocationType": "TELECOMMUTE" if job.get("isRemote") else None,
+            "baseSalary": salary,
+            "url": job.get("jobUrl"),
+        }
+
+
+class WorkdayAdapter(ATSAdapter):
+    name = "workday"
+    _HOST = re.compile(r"^(?P<tenant>[^.]+)\.wd\d+\.myworkdayjobs\.com$")
+    _PATH = re.compile(r"^/(?:[a-z]{2}-[A-Z]{2}/)?(?P<site>[^/]+)/job/(?P<job>.+)$")
+
+    def api_url(self, url: str) -> Optional[str]:
+        parts = urlsplit(url)
+        host = self._HOST.match(parts.netloc)
+        path = self._PATH.match(parts.path)
+        if not host or not path:
+            return None
+        base = self._base(f"https://{parts.netloc}")
+        return f"{base}/wday/cxs/{host['tenant']}/{path['site']}/job/{path['job']}"
+
+    def to_job_posting(self, data: Any, url: str) -> Optional[Dict]:
+        info = data.get("jobPostingInfo") if isinstance(data, dict) else None
+        if not info or not info.get("title"):
+            return None
+        locations = [info.get("location")] + list(info.get("additionalLocations") or [])
+        remote = "remote" in (info.get("remoteType") or "").lower()
+        return {
+            "@type": "JobPosting",
+            "title": info["title"],
+            "hiringOrganization": (data.get("hiringOrganization") or {}).get("name"),
+            "jobLocation": [{"address": location} for location in locations],
+            "employmentType": (info.get("timeType") or "").replace(" ", "_") or None,
+            "description": info.get("jobDescription"),
+            "datePosted": info.get("startDate"),
+            "jobLocationType": "TELECOMMUTE" if remote else None,
+            "url": info.get("externalUrl"),
+        }
+
+
+def default_adapters() -> List[ATSAdapter]:
+    return [GreenhouseAdapter(), LeverAdapter(), AshbyAdapter(), WorkdayAdapter()]
+
+
+def _pooled_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=CRAWL_MAX_CONCURRENCY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def posting_text(posting: Dict) -> str:
+    """Readable text of a JobPosting, for the LLM and for change detection."""
+    fields = job_posting_fields(posting)
+    lines = [
+        fields["job_title"],
+        fields["company"],
+        fields["location"],
+        fields["job_type"],
+        fields["job_description"],
+    ]
+    return "\n".join(line for line in lines if line)
+
+
+class ATSRegistry:
+    """
+    Adapters tried in order for each URL, sharing one pooled HTTP session.
+
+    `read` returns a `WebpageReader` holding the posting's text and, as
+    JSON-LD, the JobPosting itself, so it is parsed exactly like a page with
+    structured data. URLs no adapter recognizes return None, and are left to
+    a plain `WebpageReader`.
+
+    Responses of shared endpoints (whole job boards) are kept for
+    `board_cache_ttl` seconds, so a board is fetched once for all its jobs.
+    """
+
+    def __init__(
+        self,
+        adapters: Optional[List[ATSAdapter]] = None,
+        session: Optional[requests.Session] = None,
+        timeout: float = CRAWL_TIMEOUT,
+        board_cache_ttl: float = ATS_BOARD_CACHE_TTL,
+    ):
+        self.adapters = default_adapters() if adapters is None else list(adapters)
+        self.session = session or _pooled_session()
+        self.timeout = timeout
+        self.board_cache_ttl = board_cache_ttl
+        self._boards: Dict[str, Tuple[float, FetchedPage]] = {}
+        self._boards_lock = threading.Lock()
+        # Board fetches in flight, awaited by every job on the board
+        self._pending_boards: Dict[str, asyncio.Future] = {}
+
+    def register(self, adapter: ATSAdapter) -> None:
+        """Add an adapter, tried before the ones already registered."""
+        self.adapters.insert(0, adapter)
+
+    def find(self, url: str) -> Optional[ATSAdapter]:
+        """The adapter for `url`'s ATS, if any."""
+        return next(
+            (adapter for adapter in self.adapters if adapter.api_url(url)), None
+        )
+
+    def read(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Optional[WebpageReader]:
+        """
+        Fetch the job at `url` from its ATS's API. Returns None for unknown
+        sites, and when the API fails or has no such job.
+        """
+        adapter = self.find(url)
+        if adapter is None:
+            return None
+        api_url = adapter.api_url(url)
+        page = self._cached_board(adapter, api_url)
+        if page is None:
+            try:
+                response = self.session.get(
+                    api_url,
+                    headers=None if adapter.shared_endpoint else headers,
+                    timeout=self.timeout,
+                )
+                if response.status_code != 304:
+                    response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                logger.warning(
+                    "Error fetching %s from %s API: %s", url, adapter.name, e
+                )
+                return None
+            page = FetchedPage(
+                status=response.status_code,
+                body=None if response.status_code == 304 else response.content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+            self._store_board(adapter, api_url, page)
+        return self._reader(url, page, adapter)
+
+    async def read_async(
+        self,
+        url: str,
+        fetcher: AsyncWebFetcher,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Optional[WebpageReader]:
+        """Same as `read`, over `fetcher`'s connection pool."""
+        adapter = self.find(url)
+        if adapter is None:
+            return None
+        api_url = adapter.api_url(url)
+        page = self._cached_board(adapter, api_url)
+        if page is None:
+            if adapter.shared_endpoint:
+                pending = self._pending_boards.get(api_url)
+                if pending is None:
+                    pending = asyncio.ensure_future(fetcher.fetch_page(api_url))
+                    self._pending_boards[api_url] = pending
+                    pending.add_done_callback(
+                        lambda _: self._pending_boards.pop(api_url, None)
+                    )
+                # One job giving up must not cancel the fetch for the others
+                page = await asyncio.shield(pending)
+            else:
+                page = await fetcher.fetch_page(api_url, headers)
+            if page is None:
+                return None
+            self._store_board(adapter, api_url, page)
+        return self._reader(url, page, adapter)
+
+    def _cached_board(self, adapter: ATSAdapter, api_url: str) -> Optional[FetchedPage]:
+        if not adapter.shared_endpoint:
+            return None
+        with self._boards_lock:
+            cached = self._boards.get(api_url)
+        if cached is None or time.monotonic() - cached[0] > self.board_cache_ttl:
+            return None
+        return cached[1]
+
+    def _store_board(
+        self, adapter: ATSAdapter, api_url: str, page: FetchedPage
+    ) -> None:
+        if adapter.shared_endpoint and not page.not_modified:
+            with self._boards_lock:
+                self._boards[api_url] = (time.monotonic(), page)
+
+    def _reader(
+        self, url: str, page: FetchedPage, adapter: ATSAdapter
+    ) -> Optional[WebpageReader]:
+        if page.not_modified:
+            webpage_reader = WebpageReader(url)
+            webpage_reader.not_modified = True
+            return webpage_reader
+        webpage_reader = self.load(url, page.body, adapter)
+        if webpage_reader is not None:
+            webpage_reader.etag = page.etag
+            webpage_reader.last_modified = page.last_modified
+        return webpage_reader
+
+    def load(
+        self,
+        url: str,
+        body: Union[bytes, str],
+        adapter: Optional[ATSAdapter] = None,
+    ) -> Optional[WebpageReader]:
+        """
+        Build the reader from an API response fetched elsewhere. Returns None
+        if the response is not JSON of the expected shape, so the job can be
+        read from its page instead.
+        """
+        adapter = adapter or self.find(url)
+        try:
+            posting = adapter.to_job_posting(json.loads(body), url)
+            if posting is None:
+                logger.warning("No job found for %s in %s API", url, adapter.name)
+                return None
+            text = posting_text(posting)
+            json_ld = [json.dumps(posting, default=str)]
+        except (ValueError, TypeError, AttributeError, KeyError) as e:
+            logger.warning("Invalid %s API response for %s: %s", adapter.name, url, e)
+            return None
+
+        webpage_reader = WebpageReader(url)
+        webpage_reader.load_structured(text, json_ld)
+        return webpage_reader
+
+
+@lru_cache(maxsize=None)
+def shared_registry() -> ATSRegistry:
+    """Default registry, shared so every parser uses one connection pool."""
+    return ATSRegistry()
@@ -0,0 +1,97 @@
+"""Fetch many webpages concurrently over pooled connections."""
+
+import asyncio
+from collections import defaultdict
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from pydantic import BaseModel
+
+from bestintern.utils.logger import setup_logger
+from config.constants import CRAWL_MAX_CONCURRENCY, CRAWL_MAX_PER_HOST, CRAWL_TIMEOUT
+
+logger = setup_logger(__name__)
+
+
+class FetchedPage(BaseModel):
+    status: int
+    body: Optional[bytes] = None
+    # From the Content-Type header; None if the server did not say
+    charset: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+class AsyncWebFetcher:
+    """
+    Fetch pages with a global in-flight cap and a per-host cap.
+
+    Use as an async context manager so the connection pool is shared by every
+    request and closed once the batch is done.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = CRAWL_MAX_CONCURRENCY,
+        max_per_host: int = CRAWL_MAX_PER_HOST,
+        timeout: float = CRAWL_TIMEOUT,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "AsyncWebFetcher":
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency, limit_per_host=self.max_per_host
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._host_limits = defaultdict(lambda: asyncio.Semaphore(self.max_per_host))
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """Fetch a single page, returning its body or None on failure."""
+        page = await self.fetch_page(url)
+        return page.body if page else None
+
+    async def fetch_page(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Optional[FetchedPage]:
+        """
+        Fetch a single page with its cache validators, or None on failure.
+        Pass `If-None-Match`/`If-Modified-Since` headers for a conditional GET;
+        an unchanged page then comes back as a bodiless 304.
+        """
+        host = urlsplit(url).netloc
+        async with self._host_limits[host], self._global_limit:
+            try:
+                async with self.session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        return FetchedPage(status=304)
+                    response.raise_for_status()
+                    return FetchedPage(
+                        status=response.status,
+                        body=await response.read(),
+                        charset=response.charset,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error("Error fetching webpage %s: %s", url, e)
+                return None
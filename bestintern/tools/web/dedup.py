@@ -0,0 +1,159 @@
+"""Find near-duplicate postings of the same job across boards and URLs."""
+
+import hashlib
+import json
+import re
+import sqlite3
+from typing import Dict, Optional, Set
+
+import numpy as np
+from pydantic import BaseModel
+
+from bestintern.utils import sqlite
+from config.constants import DEDUP_INDEX_PATH, DEDUP_MAX_DISTANCE, DEDUP_MIN_SHINGLES
+
+_WORD = re.compile(r"\w+")
+_SHINGLE_WORDS = 3
+_BITS = 64
+_BANDS = 4
+_BAND_BITS = _BITS // _BANDS
+_BIT_VALUES = np.left_shift(np.uint64(1), np.arange(_BITS, dtype=np.uint64))
+
+
+def _shingles(text: str) -> Set[str]:
+    words = _WORD.findall(text.lower())
+    return {
+        " ".join(words[i : i + _SHINGLE_WORDS])
+        for i in range(max(1, len(words) - _SHINGLE_WORDS + 1))
+    }
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash of the word 3-shingles in `text`. Texts that share most of
+    their shingles get fingerprints a few bits apart.
+    """
+    return _simhash(_shingles(text))
+
+
+def _simhash(shingles: Set[str]) -> int:
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+            for s in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    bits = (hashes[:, None] & _BIT_VALUES) != 0
+    votes = 2 * bits.sum(axis=0) - len(hashes)
+    return int(_BIT_VALUES[votes > 0].sum())
+
+
+def _signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << _BITS) if value >= 1 << (_BITS - 1) else value
+
+
+def _bands(fingerprint: int):
+    mask = (1 << _BAND_BITS) - 1
+    return [(fingerprint >> (_BAND_BITS * i)) & mask for i in range(_BANDS)]
+
+
+class NearDuplicate(BaseModel):
+    url: str
+    distance: int
+    payload: Optional[Dict] = None
+
+
+class SimHashIndex:
+    """
+    SimHash fingerprints of earlier postings, with whatever was extracted from
+    them as `payload`.
+
+    Each fingerprint is split into four 16-bit bands, each with its own SQLite
+    index. Fingerprints within 3 bits of each other must agree on at least one
+    band, so a lookup only compares the few rows sharing a band value instead
+    of scanning every posting.
+
+    Texts with fewer than `min_shingles` shingles (empty pages, "job not
+    found" stubs) get no fingerprint: they would all collide with each other.
+    """
+
+    def __init__(
+        self,
+        path: str = DEDUP_INDEX_PATH,
+        max_distance: int = DEDUP_MAX_DISTANCE,
+        min_shingles: int = DEDUP_MIN_SHINGLES,
+    ):
+        if max_distance >= _BANDS:
+            raise ValueError(f"max_distance must be below {_BANDS} for banding")
+        self.path = path
+        self.max_distance = max_distance
+        self.min_shingles = min_shingles
+        sqlite.create(
+            path,
+            (
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                "url TEXT PRIMARY KEY, simhash INTEGER NOT NULL, "
+                "band0 INTEGER, band1 INTEGER, band2 INTEGER, band3 INTEGER, "
+                "payload TEXT)",
+                *(
+                    f"CREATE INDEX IF NOT EXISTS fingerprints_band{band} "
+                    f"ON fingerprints (band{band})"
+                    for band in range(_BANDS)
+                ),
+            ),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite.connect(self.path)
+
+    def fingerprint(self, text: str) -> Optional[int]:
+        """SimHash of `text`, or None if it is too short to compare."""
+        shingles = _shingles(text)
+        if len(shingles) < self.min_shingles:
+            return None
+        return _simhash(shingles)
+
+    def add(self, url: str, fingerprint: int, payload: Optional[Dict] = None) -> None:
+        """Index a posting, replacing any earlier fingerprint of `url`."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    _signed(fingerprint),
+                    *_bands(fingerprint),
+                    json.dumps(payload) if payload is not None else None,
+                ),
+            )
+
+    def find(
+        self, fingerprint: int, url: Optional[str] = None
+    ) -> Optional[NearDuplicate]:
+        """
+        Return the closest indexed posting within `max_distance` bits, if
+        any. Earlier versions of `url` itself are not counted as duplicates.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, simhash, payload FROM fingerprints "
+                "WHERE band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?",
+                _bands(fingerprint),
+            ).fetchall()
+
+        best = None
+        for candidate_url, candidate, payload in rows:
+            if candidate_url == url:
+                continue
+            distance = (fingerprint ^ (candidate % (1 << _BITS))).bit_count()
+            if distance <= self.max_distance and (
+                best is None or distance < best.distance
+            ):
+                best = NearDuplicate(
+                    url=candidate_url,
+                    distance=distance,
+                    payload=json.loads(payload) if payload else None,
+                )
+        return best
@@ -0,0 +1,208 @@
+"""Create Chrome WebDrivers and share warm ones across page reads."""
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Deque, Dict, Iterator, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver
+from webdriver_manager.chrome import ChromeDriverManager
+
+from bestintern.utils.logger import setup_logger
+from config.constants import DRIVER_MAX_USES, DRIVER_POOL_SIZE
+
+logger = setup_logger(__name__)
+
+# Subresources that never affect the text we extract from a page
+BLOCKED_RESOURCE_PATTERNS = [
+    # images
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.avif",
+    "*.svg",
+    "*.ico",
+    # fonts
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    # media
+    "*.mp4",
+    "*.webm",
+    "*.mp3",
+    # stylesheets
+    "*.css",
+]
+
+
+@lru_cache(maxsize=None)
+def _chromedriver_path() -> str:
+    """Resolve the chromedriver binary once per process."""
+    return ChromeDriverManager().install()
+
+
+def create_chrome_driver(
+    headless: bool = True, block_resources: bool = True
+) -> WebDriver:
+    """
+    Start a new Chrome WebDriver.
+
+    With `block_resources`, pages load eagerly (no waiting for subresources)
+    and images, fonts, media and stylesheets are never downloaded, since only
+    the rendered DOM text is read.
+    """
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    if block_resources:
+        options.page_load_strategy = "eager"
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+
+    driver = webdriver.Chrome(service=Service(_chromedriver_path()), options=options)
+    if block_resources:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_PATTERNS}
+        )
+    return driver
+
+
+class WebDriverPool:
+    """
+    Bounded, thread-safe pool of warm headless Chrome drivers.
+
+    Drivers are checked out per page with `driver()`, have their cookies and
+    storage cleared when returned, and are replaced after `max_uses` pages or
+    whenever a page read crashes.
+    """
+
+    def __init__(
+        self,
+        size: int = DRIVER_POOL_SIZE,
+        max_uses: int = DRIVER_MAX_USES,
+        headless: bool = True,
+        block_resources: bool = True,
+    ):
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self.block_resources = block_resources
+        self._idle: Deque[WebDriver] = deque()
+        self._uses: Dict[int, int] = {}
+        self._created = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> WebDriver:
+        """Check out a driver, starting a new one if the pool is not full."""
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._closed or self._idle or self._created < self.size,
+                timeout=timeout,
+            ):
+                raise TimeoutError("Timed out waiting for a free WebDriver")
+            if self._closed:
+                raise RuntimeError("WebDriverPool is closed")
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        try:
+            driver = create_chrome_driver(
+                headless=self.headless, block_resources=self.block_resources
+            )
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+        self._uses[id(driver)] = 0
+        logger.info("Started WebDriver (%d/%d)", self._created, self.size)
+        return driver
+
+    def release(self, driver: WebDriver, broken: bool = False) -> None:
+        """Return a driver to the pool, recycling it if worn out or broken."""
+        uses = self._uses.get(id(driver), 0) + 1
+        self._uses[id(driver)] = uses
+
+        if not broken and uses < self.max_uses and not self._closed:
+            try:
+                self._reset(driver)
+            except WebDriverException as e:
+                logger.warning("Failed to reset WebDriver, recycling it: %s", e)
+                broken = True
+        else:
+            broken = True
+
+        if broken:
+            self._quit(driver)
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            return
+
+        with self._condition:
+            self._idle.append(driver)
+            self._condition.notify()
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None) -> Iterator[WebDriver]:
+        """Check out a driver for the duration of the block."""
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        except TimeoutException:
+            # A wait that timed out leaves a healthy browser behind
+            self.release(driver)
+            raise
+        except Exception:
+            self.release(driver, broken=True)
+            raise
+        else:
+            self.release(driver)
+
+    def close(self) -> None:
+        """Quit every idle driver; drivers in use are quit when released."""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._created -= len(idle)
+            self._condition.notify_all()
+        for driver in idle:
+            self._quit(driver)
+
+    def _reset(self, driver: WebDriver) -> None:
+        """Clear cookies and storage so the next page starts clean."""
+        origin = driver.execute_script("return window.location.origin")
+        if origin and origin != "null":
+            driver.execute_cdp_cmd(
+                "Storage.clearDataForOrigin",
+                {"origin": origin, "storageTypes": "all"},
+            )
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.get("about:blank")
+
+    def _quit(self, driver: WebDriver) -> None:
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            logger.warning("Error quitting WebDriver: %s", e)
+
+    def __enter__(self) -> "WebDriverPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
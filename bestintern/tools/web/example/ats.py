@@ -0,0 +1,97 @@
+"""
+Example file using ATSRegistry against recorded API responses.
+
+Serves the JSON in `fixtures/ats` from a local HTTP server, points each
+adapter's `api_base` at it, and reads one posting per applicant-tracking
+system. No network access or LLM calls are needed.
+
+Steps:
+- run `python -m bestintern.tools.web.example.ats`
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bestintern.tools.web.ats import (
+    AshbyAdapter,
+    ATSRegistry,
+    GreenhouseAdapter,
+    LeverAdapter,
+    WorkdayAdapter,
+)
+from bestintern.tools.web.jsonld import find_job_posting, job_posting_fields
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures/ats")
+
+# API path prefix -> recorded response
+FIXTURES = {
+    "/v1/boards/": "greenhouse.json",
+    "/v0/postings/": "lever.json",
+    "/posting-api/job-board/": "ashby.json",
+    "/wday/cxs/": "workday.json",
+}
+
+JOB_URLS = [
+    "https://job-boards.greenhouse.io/acme/jobs/4012345",
+    "https://jobs.lever.co/acme/0f3c1a52-6a0e-4c1b-9d59-2f1b7e3c9a10",
+    "https://jobs.ashbyhq.com/acme/7d2e9b40-1c55-4f6e-8a3b-5e0d2c4f1a77",
+    "https://nvidia.wd5.myworkdayjobs.com/en-US/NVIDIAExternalCareerSite/job/"
+    "Director--Strategic-Sourcing---Professional-Services_JR1983742",
+    # Unknown sites are left to WebpageReader
+    "https://careers.tiktok.com/position/7393074791714834739/detail",
+]
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        name = next(
+            (name for prefix, name in FIXTURES.items() if self.path.startswith(prefix)),
+            None,
+        )
+        if name is None:
+            self.send_error(404)
+            return
+        with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_base = f"http://127.0.0.1:{server.server_port}"
+
+    registry = ATSRegistry(
+        adapters=[
+            GreenhouseAdapter(api_base=api_base),
+            LeverAdapter(api_base=api_base),
+            AshbyAdapter(api_base=api_base),
+            WorkdayAdapter(api_base=api_base),
+        ]
+    )
+    try:
+        for url in JOB_URLS:
+            webpage_reader = registry.read(url)
+            if webpage_reader is None:
+                print(f"{url}: no ATS adapter, read the page instead\n")
+                continue
+            fields = job_posting_fields(find_job_posting(webpage_reader.json_ld))
+            print(f"{url} ({registry.find(url).name}):")
+            for field, value in fields.items():
+                if value:
+                    print(f"  {field}: {value}")
+            print()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark of HTML extraction for job pages.
+
+Compares the previous path, a BeautifulSoup "html.parser" tree with
+`get_text` and one `find_all` per metadata tag, with the single-pass lxml
+`extract_html`. Also reports the memory a reader keeps after loading a page.
+Pages are generated to the size of real job postings: site navigation,
+inline styles and state scripts, the posting and a footer. No network access
+is needed.
+
+Steps:
+- run `python -m bestintern.tools.web.example.benchmark`
+"""
+
+import json
+import random
+import tracemalloc
+from timeit import timeit
+
+from bs4 import BeautifulSoup
+
+from bestintern.tools.web.html import extract_html
+from bestintern.tools.web.reader import WebpageReader
+
+TAGS = ["meta", "h1", "h2", "p"]
+WORDS = (
+    "design build maintain scalable services python kubernetes team customers "
+    "data pipelines experience engineering product collaborate ownership "
+    "testing reliability cloud infrastructure mentor growth impact"
+).split()
+
+
+def sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+
+def job_page(rng: random.Random, sections: int, state_entries: int) -> str:
+    """A job posting page of roughly real size and shape."""
+    nav = "".join(
+        f'<li class="nav-item"><a href="/jobs/{i}">{sentence(rng, 3)}</a></li>'
+        for i in range(120)
+    )
+    state = json.dumps(
+        {"jobs": [{"id": i, "title": sentence(rng, 6)} for i in range(state_entries)]}
+    )
+    body = "".join(
+        f"<h2>{sentence(rng, 3)}</h2>"
+        + "".join(f"<p>{sentence(rng, 25)}</p>" for _ in range(4))
+        + "<ul>"
+        + "".join(f"<li>{sentence(rng, 10)}</li>" for _ in range(8))
+        + "</ul>"
+        for _ in range(sections)
+    )
+    footer = "".join(f'<a href="/l/{i}">{sentence(rng, 2)}</a>' for i in range(80))
+    return (
+        "<!DOCTYPE html><html><head>"
+        '<meta charset="utf-8"><meta name="description" content="Job">'
+        f"<title>{sentence(rng, 5)}</title>"
+        f"<style>{'.c{color:red;margin:0 auto}' * 400}</style>"
+        f"<script>window.__STATE__ = {state};</script></head><body>"
+        f'<header><nav><ul class="menu">{nav}</ul></nav></header>'
+        f'<main><div class="posting"><h1>{sentence(rng, 4)}</h1>{body}</div></main>'
+        f"<footer>{footer}</footer></body></html>"
+    )
+
+
+def bs4_path(html: bytes):
+    """The previous WebpageReader.load_html followed by extract_metadata."""
+    soup = BeautifulSoup(html, "html.parser")
+    text = soup.get_text(separator="\n")
+    metadata = {}
+    for tag in TAGS:
+        data = [element.text.strip() for element in soup.find_all(tag)]
+        metadata[tag] = ",".join(data) if data else None
+    return text, metadata
+
+
+def retained_bytes(load) -> int:
+    """Memory still allocated by the object `load` returns."""
+    tracemalloc.start()
+    kept = load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main():
+    rng = random.Random(0)
+    for sections, state_entries in ((3, 80), (8, 480), (20, 4800)):
+        html = job_page(rng, sections, state_entries).encode("utf-8")
+
+        text, metadata = bs4_path(html)
+        extracted = extract_html(html, TAGS)
+        assert extracted.metadata == metadata
+        assert extracted.text.split() == text.split()
+
+        number = 10
+        before = timeit(lambda: bs4_path(html), number=number) / number
+        after = timeit(lambda: extract_html(html, TAGS), number=number) / number
+
+        def load_soup():
+            soup = BeautifulSoup(html, "html.parser")
+            return soup, soup.get_text(separator="\n")
+
+        def load_reader():
+            reader = WebpageReader("https://example.com", metadata_tags=TAGS)
+            reader.load_html(html)
+            return reader
+
+        print(
+            f"{len(html) / 1024:>6.0f} KB page: "
+            f"{before * 1e3:.1f} ms bs4, {after * 1e3:.1f} ms lxml "
+            f"({before / after:.1f}x); kept after load: "
+            f"{retained_bytes(load_soup) / 1024:.0f} KB soup, "
+            f"{retained_bytes(load_reader) / 1024:.0f} KB reader"
+        )
+
+
+if __name__ == "__main__":
+    main()
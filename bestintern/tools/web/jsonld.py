@@ -0,0 +1,171 @@
+"""Read schema.org JobPosting structured data embedded in job pages."""
+
+import html
+import json
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional
+
+from bestintern.tools.web.html import extract_html
+from bestintern.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _walk(node: Any) -> Iterator[Dict]:
+    """Every object in a JSON-LD document, including inside `@graph` lists."""
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+    elif isinstance(node, dict):
+        yield node
+        yield from _walk(node.get("@graph", []))
+
+
+def _is_job_posting(node: Dict) -> bool:
+    types = node.get("@type", [])
+    return "JobPosting" in (types if isinstance(types, list) else [types])
+
+
+def find_job_posting(json_ld: List[str]) -> Optional[Dict]:
+    """The first JobPosting object in the page's JSON-LD blocks, if any."""
+    for block in json_ld:
+        try:
+            document = json.loads(block)
+        except ValueError:
+            logger.debug("Skipping malformed JSON-LD block")
+            continue
+        for node in _walk(document):
+            if _is_job_posting(node):
+                return node
+    return None
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _name(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get("name")
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _strings(value: Any, *keys: str, split: bool = False) -> Optional[List[str]]:
+    """
+    Text of a string, object or list of either, taking objects' first key
+    found. With `split`, comma-separated strings become several items.
+    """
+    strings = []
+    for item in _as_list(value):
+        if isinstance(item, dict):
+            if item.get("monthsOfExperience"):
+                item = f"{item['monthsOfExperience']} months of experience"
+            else:
+                item = next((item[key] for key in keys if item.get(key)), None)
+        if not isinstance(item, str):
+            continue
+        parts = item.split(",") if split else [item]
+        strings.extend(part.strip() for part in parts if part.strip())
+    return strings or None
+
+
+def _date(value: Any) -> Optional[date]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value.strip()[:10])
+    except ValueError:
+        return None
+
+
+def _location(value: Any) -> Optional[str]:
+    places = []
+    for place in _as_list(value):
+        address = place.get("address", place) if isinstance(place, dict) else place
+        if isinstance(address, dict):
+            parts = [
+                _name(address.get(key))
+                for key in ("addressLocality", "addressRegion", "addressCountry")
+            ]
+            address = ", ".join(part for part in parts if part)
+        if isinstance(address, str) and address.strip():
+            places.append(address.strip())
+    return "; ".join(dict.fromkeys(places)) or None
+
+
+def _job_type(value: Any) -> Optional[str]:
+    types = [t.replace("_", "-").lower() for t in _as_list(value) if isinstance(t, str)]
+    return ", ".join(types) or None
+
+
+def _amount(value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        try:
+            value = float(value.replace(",", ""))
+        except ValueError:
+            return None
+    if not isinstance(value, (int, float)):
+        return None
+    return f"{value:,.0f}" if value == int(value) else f"{value:,.2f}"
+
+
+def _salary(value: Any) -> Optional[str]:
+    """Salary such as "USD 120,000-150,000 per year" from a MonetaryAmount."""
+    if not isinstance(value, dict):
+        return None
+    quantity = value.get("value")
+    if isinstance(quantity, dict):
+        low = _amount(quantity.get("minValue", quantity.get("value")))
+        high = _amount(quantity.get("maxValue"))
+        unit = quantity.get("unitText")
+    else:
+        low, high, unit = _amount(quantity), None, value.get("unitText")
+    if low is None:
+        return None
+    salary = f"{low}-{high}" if high and high != low else low
+    if value.get("currency"):
+        salary = f"{value['currency']} {salary}"
+    if isinstance(unit, str) and unit:
+        salary = f"{salary} per {unit.lower()}"
+    return salary
+
+
+def _description(value: Any) -> Optional[str]:
+    # Descriptions are usually HTML themselves, often escaped once more
+    if not isinstance(value, str):
+        return None
+    value = html.unescape(value)
+    lines = extract_html(value).text.splitlines() if "<" in value else [value]
+    text = "\n".join(line.strip() for line in lines if line.strip())
+    return text or None
+
+
+def job_posting_fields(posting: Dict) -> Dict[str, Any]:
+    """
+    `JobMetadata` fields from a schema.org JobPosting. Fields the posting
+    does not state are None.
+    """
+    remote = None
+    if str(posting.get("jobLocationType", "")).upper() == "TELECOMMUTE":
+        remote = True
+    return {
+        "job_title": _name(posting.get("title")),
+        "company": _name(posting.get("hiringOrganization")),
+        "location": _location(posting.get("jobLocation")),
+        "job_description": _description(posting.get("description")),
+        "salary_range": _salary(posting.get("baseSalary")),
+        "job_type": _job_type(posting.get("employmentType")),
+        "posted_date": _date(posting.get("datePosted")),
+        "deadline": _date(posting.get("validThrough")),
+        "remote": remote,
+        "skills_required": _strings(posting.get("skills"), "name", split=True),
+        "education_required": _strings(
+            posting.get("educationRequirements"), "credentialCategory", "name"
+        ),
+        "experience_required": _strings(
+            posting.get("experienceRequirements"), "description", "name"
+        ),
+        "benefits": _strings(posting.get("jobBenefits"), "name", split=True),
+    }
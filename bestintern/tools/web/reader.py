@@ -1,19 +1,62 @@
 """Read Webpages and get metadata."""
 
 import re
-from time import sleep
-from typing import List, Optional
+from enum import Enum
+from time import perf_counter, sleep
+from typing import Dict, Iterable, List, Optional, Union
 
 import requests
 from bs4 import BeautifulSoup
 from pydantic import BaseModel
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+
+from bestintern.tools.web.driver import WebDriverPool, create_chrome_driver
+from bestintern.tools.web.html import (
+    charset_from_content_type,
+    decode_html,
+    extract_html,
+)
+from bestintern.utils.logger import setup_logger
+from bestintern.utils.metrics import span
+
+logger = setup_logger(__name__)
+
+# Tracks the last DOM mutation (or finished network request) and reports
+# whether the page has been quiet for `quietMs` milliseconds.
+_READINESS_SCRIPT = """
+var mode = arguments[0], quietMs = arguments[1];
+if (window.__bestinternLastChange === undefined) {
+  window.__bestinternLastChange = performance.now();
+  new MutationObserver(function () {
+    window.__bestinternLastChange = performance.now();
+  }).observe(document, {
+    subtree: true, childList: true, attributes: true, characterData: true
+  });
+  return false;
+}
+var lastChange = window.__bestinternLastChange;
+if (mode === "network_idle") {
+  if (document.readyState !== "complete") return false;
+  lastChange = performance.getEntriesByType("resource").reduce(
+    function (latest, entry) { return Math.max(latest, entry.responseEnd); }, 0
+  );
+} else if (document.readyState === "loading") {
+  return false;
+}
+return performance.now() - lastChange >= quietMs;
+"""
+
+
+class ReadinessMode(Enum):
+    """How to decide a page is ready when no element to wait for is given."""
+
+    sleep = "sleep"  # always wait the full timeout
+    dom_quiet = "dom_quiet"  # DOM parsed and no mutations for `quiet_period`
+    network_idle = "network_idle"  # page loaded and no requests for `quiet_period`
 
 
 class WaitOptions(BaseModel):
@@ -25,30 +68,105 @@ class WaitOptions(BaseModel):
     html_tag: Optional[str] = None
     html_attribute: Optional[str] = None
     timeout: int = 5
+    readiness: ReadinessMode = ReadinessMode.dom_quiet
+    quiet_period: float = 0.5
 
 
 class WebpageReader:
-    def __init__(self, url: str):
+    """
+    Reads a webpage and extracts its text.
+
+    Pages are parsed with lxml in one pass that also collects the text of
+    `metadata_tags`, so `extract_metadata` for those tags needs no second
+    walk, and any JSON-LD blocks (`json_ld`). Only the raw HTML is kept;
+    `soup` builds a BeautifulSoup tree from it on first access for callers
+    that need one.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        driver_pool: Optional[WebDriverPool] = None,
+        metadata_tags: Iterable[str] = (),
+    ):
         self.url = url
+        self.driver_pool = driver_pool
+        self.metadata_tags = list(metadata_tags)
         self.text = None
-        self.soup = None
+        self.html: Optional[str] = None
+        self.metadata: Dict[str, Optional[str]] = {}
+        self.json_ld: List[str] = []
+        self._soup: Optional[BeautifulSoup] = None
+        self.wait_seconds: Optional[float] = None
+        self.wait_saved_seconds: Optional[float] = None
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.not_modified = False
 
     def read_webpage(
-        self, use_selenium: bool = False, wait_options: Optional[WaitOptions] = None
+        self,
+        use_selenium: bool = False,
+        wait_options: Optional[WaitOptions] = None,
+        headers: Optional[Dict[str, str]] = None,
     ):
-        """Fetches the webpage content and stores the extracted text."""
+        """
+        Fetches the webpage content and stores the extracted text.
+
+        `headers` are sent with plain requests, e.g. validators for a
+        conditional GET; if the server answers 304, `not_modified` is set and
+        no text is read.
+        """
         if use_selenium:
             self._read_with_selenium(wait_options or WaitOptions())
         else:
-            self._read_with_requests()
+            self._read_with_requests(headers)
+
+    def load_html(self, html: Union[bytes, str], charset: Optional[str] = None):
+        """
+        Parses already fetched HTML and stores the extracted text. Bytes are
+        decoded first, with `charset` from the response headers if known.
+        """
+        with span("html_parse"):
+            html = decode_html(html, charset)
+            extracted = extract_html(html, self.metadata_tags)
+        self.html = html
+        self.text = extracted.text
+        self.metadata = extracted.metadata
+        self.json_ld = extracted.json_ld
+        self._soup = None
 
-    def _read_with_requests(self):
+    def load_structured(self, text: str, json_ld: List[str]):
+        """
+        Stores text and JSON-LD read from an API rather than a page, e.g. an
+        applicant-tracking system's job endpoint. There is no HTML to parse.
+        """
+        self.html = ""
+        self.text = text
+        self.metadata = {}
+        self.json_ld = json_ld
+        self._soup = None
+
+    @property
+    def soup(self) -> Optional[BeautifulSoup]:
+        """BeautifulSoup tree of the page, built on first access."""
+        if self._soup is None and self.html is not None:
+            self._soup = BeautifulSoup(self.html, "html.parser")
+        return self._soup
+
+    def _read_with_requests(self, headers: Optional[Dict[str, str]] = None):
         """Read webpage using requests and BeautifulSoup."""
         try:
-            response = requests.get(self.url, timeout=10)
+            response = requests.get(self.url, headers=headers, timeout=10)
+            if response.status_code == 304:
+                self.not_modified = True
+                return
             response.raise_for_status()
-            self.soup = BeautifulSoup(response.content, "html.parser")
-            self.text = self.soup.get_text(separator="\n")
+            self.etag = response.headers.get("ETag")
+            self.last_modified = response.headers.get("Last-Modified")
+            self.load_html(
+                response.content,
+                charset_from_content_type(response.headers.get("Content-Type")),
+            )
         except requests.exceptions.RequestException as e:
             print(f"Error fetching webpage: {e}")
             self.text = None
@@ -56,21 +174,30 @@ class WebpageReader:
     def _read_with_selenium(self, wait_options: WaitOptions):
         """Read webpage using Selenium."""
         try:
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-            driver.get(self.url)
-
-            self._wait_for_element(driver, wait_options)
-
-            self.soup = BeautifulSoup(driver.page_source, "html.parser")
-            self.text = self.soup.get_text(separator="\n")
-            driver.quit()
+            if self.driver_pool:
+                with self.driver_pool.driver() as driver:
+                    self._load_with_driver(driver, wait_options)
+            else:
+                driver = create_chrome_driver(headless=False)
+                try:
+                    self._load_with_driver(driver, wait_options)
+                finally:
+                    driver.quit()
         except Exception as e:  # pylint: disable=broad-exception-caught
             print(f"Error fetching webpage with Selenium: {e}")
             self.text = None
 
+    def _load_with_driver(self, driver: WebDriver, wait_options: WaitOptions):
+        """Load the page in the given driver and parse its rendered source."""
+        driver.get(self.url)
+        with span("selenium_wait"):
+            self._wait_for_element(driver, wait_options)
+        self.load_html(driver.page_source)
+
     def _wait_for_element(self, driver: WebDriver, wait_options: WaitOptions):
         """Wait for a specific element or content to load."""
-        wait = WebDriverWait(driver, wait_options.timeout)
+        wait = WebDriverWait(driver, wait_options.timeout, poll_frequency=0.1)
+        start = perf_counter()
 
         if wait_options.element_id:
             wait.until(EC.presence_of_element_located((By.ID, wait_options.element_id)))
@@ -98,7 +225,34 @@ class WebpageReader:
                 )
             wait.until(lambda d: d.execute_script(script))
         else:
+            self._wait_for_readiness(wait, wait_options)
+            elapsed = perf_counter() - start
+            self.wait_saved_seconds = wait_options.timeout - elapsed
+            logger.info(
+                "Page %s ready after %.2fs (%.2fs saved, readiness=%s)",
+                self.url,
+                elapsed,
+                self.wait_saved_seconds,
+                wait_options.readiness.value,
+            )
+        self.wait_seconds = perf_counter() - start
+
+    def _wait_for_readiness(self, wait: WebDriverWait, wait_options: WaitOptions):
+        """Wait until the page is stable, or for the full timeout at most."""
+        if wait_options.readiness == ReadinessMode.sleep:
             sleep(wait_options.timeout)
+            return
+
+        quiet_ms = wait_options.quiet_period * 1000
+        try:
+            wait.until(
+                lambda d: d.execute_script(
+                    _READINESS_SCRIPT, wait_options.readiness.value, quiet_ms
+                )
+            )
+        except TimeoutException:
+            # Pages that never settle are read as-is, like after a fixed sleep
+            logger.info("Page %s did not settle within timeout", self.url)
 
     def get_text(self, remove_multiple_newlines: bool = False) -> str:
         """Returns the extracted text from the webpage."""
@@ -114,11 +268,11 @@ class WebpageReader:
         """
         Extracts specific metadata from the webpage text based on provided HTML tags.
         """
-        if not self.soup:
+        if self.html is None:
             self.read_webpage()
 
-        metadata = {}
-        for tag in tags:
-            data = [element.text.strip() for element in self.soup.find_all(tag)]
-            metadata[tag] = delimiter.join(data) if data else None
-        return metadata
+        missing = [tag for tag in tags if tag not in self.metadata]
+        if missing or delimiter != ",":
+            extracted = extract_html(self.html or "", tags, delimiter=delimiter)
+            return extracted.metadata
+        return {tag: self.metadata[tag] for tag in tags}
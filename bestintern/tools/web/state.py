@@ -0,0 +1,93 @@
+"""Remember what each crawled URL looked like, to skip unchanged pages."""
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from bestintern.utils import sqlite
+from config.constants import CRAWL_STATE_PATH
+
+
+def text_hash(text: str) -> str:
+    """Hash of `text` that ignores whitespace-only differences."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class CrawlState(BaseModel):
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    text_hash: Optional[str] = None
+    extraction: Optional[Dict] = None
+    crawled_at: float = Field(default_factory=time.time)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Validators for a conditional GET of this URL."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class CrawlStateStore:
+    """
+    Per-URL validators, text hash and last extraction from previous crawls.
+
+    Stored in SQLite so daily recrawls, and parallel crawler processes, can
+    share it.
+    """
+
+    def __init__(self, path: str = CRAWL_STATE_PATH):
+        self.path = path
+        sqlite.create(
+            path,
+            (
+                "CREATE TABLE IF NOT EXISTS crawl_state ("
+                "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                "text_hash TEXT, extraction TEXT, crawled_at REAL NOT NULL)",
+            ),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite.connect(self.path)
+
+    def get(self, url: str) -> Optional[CrawlState]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT url, etag, last_modified, text_hash, extraction, crawled_at "
+                "FROM crawl_state WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        url, etag, last_modified, hash_, extraction, crawled_at = row
+        return CrawlState(
+            url=url,
+            etag=etag,
+            last_modified=last_modified,
+            text_hash=hash_,
+            extraction=json.loads(extraction) if extraction else None,
+            crawled_at=crawled_at,
+        )
+
+    def put(self, state: CrawlState) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO crawl_state "
+                "(url, etag, last_modified, text_hash, extraction, crawled_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    state.url,
+                    state.etag,
+                    state.last_modified,
+                    state.text_hash,
+                    json.dumps(state.extraction) if state.extraction else None,
+                    state.crawled_at,
+                ),
+            )
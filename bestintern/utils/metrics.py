@@ -0,0 +1,236 @@
+"""
+Timings, token counts and retries of the parse pipelines.
+
+Metrics are off until `enable()` is called. While off, `span` returns a
+shared no-op context manager and `observe`/`inc` return after one flag
+check, so instrumented code costs next to nothing. While on, observations
+are aggregated in memory into histograms and counters, exported with
+`export_json` or `export_prometheus` (Prometheus text format).
+
+Spans nest: `parse_job` includes `fetch`, which includes `html_parse`.
+"""
+
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config.constants import (
+    METRICS_RETRY_BUCKETS,
+    METRICS_SECONDS_BUCKETS,
+    METRICS_TOKEN_BUCKETS,
+)
+
+_enabled = False
+_metrics: List["_Metric"] = []
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def enable(enabled: bool = True) -> None:
+    """Start (or with False, stop) recording metrics."""
+    global _enabled
+    _enabled = enabled
+
+
+def disable() -> None:
+    enable(False)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._series: Dict[Labels, Any] = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(_Metric):
+    """A running total per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if not _enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def _export(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"labels": dict(key), "value": value}
+                for key, value in self._series.items()
+            ]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets: int):
+        # Per bucket, plus one for values above the last bound
+        self.counts = [0] * (buckets + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+
+class Histogram(_Metric):
+    """Distribution of observed values per label set, over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float]):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not _enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[bisect_left(self.buckets, value)] += 1
+            series.count += 1
+            series.sum += value
+            series.min = min(series.min, value)
+            series.max = max(series.max, value)
+
+    def _export(self) -> List[Dict[str, Any]]:
+        exported = []
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative, buckets = 0, {}
+                for bound, count in zip((*self.buckets, "+Inf"), series.counts):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                exported.append(
+                    {
+                        "labels": dict(key),
+                        "count": series.count,
+                        "sum": series.sum,
+                        "mean": series.sum / series.count,
+                        "min": series.min,
+                        "max": series.max,
+                        "buckets": buckets,
+                    }
+                )
+        return exported
+
+
+STAGE_SECONDS = Histogram(
+    "bestintern_stage_seconds",
+    "Time spent in each stage of parsing a job or resume.",
+    METRICS_SECONDS_BUCKETS,
+)
+LLM_TOKENS = Histogram(
+    "bestintern_llm_tokens",
+    "Prompt and completion tokens per LLM call, as reported by the provider.",
+    METRICS_TOKEN_BUCKETS,
+)
+LLM_COST = Counter(
+    "bestintern_llm_cost_dollars_total",
+    "Estimated cost of LLM calls in US dollars.",
+)
+EXTRACTION_RETRIES = Histogram(
+    "bestintern_extraction_retries",
+    "Retries after an invalid LLM answer, per extraction.",
+    METRICS_RETRY_BUCKETS,
+)
+EXTRACTIONS = Counter(
+    "bestintern_extractions_total",
+    "Extractions by outcome: llm, cached or failed.",
+)
+
+
+class _Span:
+    __slots__ = ("labels", "start")
+
+    def __init__(self, labels: Dict[str, Any]):
+        self.labels = labels
+
+    def __enter__(self) -> "_Span":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        STAGE_SECONDS.observe(perf_counter() - self.start, **self.labels)
+
+
+_NO_SPAN = nullcontext()
+
+
+def span(stage: str):
+    """Context manager timing `stage` into `bestintern_stage_seconds`."""
+    if not _enabled:
+        return _NO_SPAN
+    return _Span({"stage": stage})
+
+
+def reset() -> None:
+    """Drop everything recorded so far."""
+    for metric in _metrics:
+        metric.reset()
+
+
+def export_json() -> Dict[str, Any]:
+    """Every metric with its description, kind and one entry per label set."""
+    return {
+        metric.name: {
+            "kind": metric.kind,
+            "description": metric.description,
+            "series": metric._export(),
+        }
+        for metric in _metrics
+    }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None):
+    pairs = list(labels.items()) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def export_prometheus() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for series in metric._export():
+            labels = series["labels"]
+            if metric.kind == "counter":
+                lines.append(f"{metric.name}{_label_text(labels)} {series['value']}")
+                continue
+            for bound, count in series["buckets"].items():
+                lines.append(
+                    f"{metric.name}_bucket{_label_text(labels, ('le', bound))} {count}"
+                )
+            lines.append(f"{metric.name}_sum{_label_text(labels)} {series['sum']}")
+            lines.append(f"{metric.name}_count{_label_text(labels)} {series['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,30 @@
+"""SQLite files shared by threads and processes, as used by the local stores."""
+
+import os
+import sqlite3
+from typing import Iterable, Optional
+
+from config.constants import SQLITE_TIMEOUT
+
+
+def connect(path: str, synchronous: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Open the database at `path`. Stores open a connection per call, which
+    keeps them usable from threads and processes; `with connect(...)` commits.
+    """
+    conn = sqlite3.connect(path, timeout=SQLITE_TIMEOUT)
+    if synchronous:
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+    return conn
+
+
+def create(path: str, schema: Iterable[str]) -> None:
+    """
+    Create the database at `path` (and its directory) in WAL mode, so readers
+    don't block the writer, and run the `schema` statements.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in schema:
+            conn.execute(statement)
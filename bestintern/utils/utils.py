@@ -2,7 +2,8 @@ import json
 import os
 import re
 from datetime import date, datetime
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, List
 
 from jinja2 import Environment, FileSystemLoader, Template
 
@@ -52,6 +53,33 @@ def parse_llm_response(response: str) -> Dict[str, Any]:
         raise ValueError("LLM response is not a valid JSON") from jde
 
 
+def parse_llm_response_array(response: str) -> List[Any]:
+    """
+    Parses a JSON array from an LLM response into a list.
+
+    Args:
+        response: The response from the LLM.
+
+    Returns:
+        The parsed JSON array.
+
+    Raises:
+        ValueError: If no valid JSON array is found in the response.
+    """
+    start = response.find("[")
+    end = response.rfind("]")
+    if start == -1 or end == -1 or start > end:
+        raise ValueError("No valid JSON array found in the response")
+
+    try:
+        data = json.loads(response[start : end + 1])
+    except json.JSONDecodeError as jde:
+        raise ValueError("LLM response is not a valid JSON array") from jde
+    if not isinstance(data, list):
+        raise ValueError("LLM response is not a valid JSON array")
+    return data
+
+
 def parse_date(date_str: str) -> date:
     """
     Parses a date string into a date object.
@@ -83,11 +111,17 @@ def load_jinja_template(
     if templates_dir is None:
         templates_dir = os.path.dirname(os.path.abspath(__file__))
     templates_folder = os.path.join(templates_dir, "templates")
-    env = Environment(loader=FileSystemLoader(templates_folder))
+    env = _jinja_environment(templates_folder)
     template = env.get_template(template_name)
     return template
 
 
+@lru_cache(maxsize=None)
+def _jinja_environment(templates_folder: str) -> Environment:
+    """Shares one Jinja environment, and its template cache, per folder."""
+    return Environment(loader=FileSystemLoader(templates_folder))
+
+
 def clean_json_structure(data):
     def extract_type(any_of_list):
         for item in any_of_list:
@@ -4,3 +4,96 @@ JOB_VECTORS_TABLE = "job_vectors"
 
 # Number of Max Attempts for Modeler
 MAX_ATTEMPTS = 2
+
+# Token budget for text sent to the LLM when preprocessing, per model
+DEFAULT_TOKEN_BUDGET = 6_000
+MODEL_TOKEN_BUDGETS = {
+    "gemini/gemini-pro": 6_000,
+    "gemini/gemini-1.5-flash": 8_000,
+}
+
+# Provider quotas per model as (requests per minute, tokens per minute)
+DEFAULT_RATE_LIMIT = (60, 100_000)
+MODEL_RATE_LIMITS = {
+    "gemini/gemini-pro": (360, 120_000),
+    "gemini/gemini-1.5-flash": (1_000, 4_000_000),
+}
+# Completion tokens assumed for a request before the provider reports usage
+ESTIMATED_COMPLETION_TOKENS = 1_024
+# Seconds before retrying an LLM call that failed on the provider's side,
+# doubled on each retry; rate-limited calls wait for the limiter instead
+LLM_RETRY_BACKOFF = 1
+
+# Texts sent per embedding request
+EMBEDDING_BATCH_SIZE = 100
+
+# Max documents packed into one batched extraction prompt
+BATCH_MAX_DOCUMENTS = 10
+# Tokens set aside in a batched prompt's budget for each document's answer
+BATCH_ITEM_TOKENS = 300
+
+# Seconds a SQLite store waits for another connection's write lock
+SQLITE_TIMEOUT = 30
+
+# Extraction Cache
+EXTRACTION_CACHE_PATH = ".cache/extractions.sqlite3"
+EXTRACTION_CACHE_MAX_ENTRIES = 100_000
+
+# Async Crawler Limits
+CRAWL_MAX_CONCURRENCY = 64
+CRAWL_MAX_PER_HOST = 4
+CRAWL_TIMEOUT = 10
+# Seconds a whole-board ATS response (Ashby) is reused for the jobs on it
+ATS_BOARD_CACHE_TTL = 300
+
+# Selenium WebDriver Pool
+DRIVER_POOL_SIZE = 4
+DRIVER_MAX_USES = 50
+
+# Approximate Nearest-Neighbor Job Index
+ANN_NPROBE = 8
+ANN_KMEANS_ITERATIONS = 10
+
+# Bulk writes to Supabase: rows and JSON bytes per request, requests in flight
+BULK_MAX_ROWS = 500
+BULK_MAX_BYTES = 1_000_000
+BULK_MAX_CONCURRENCY = 4
+# Error codes of rows PostgREST refused (SQLSTATE cardinality, data and
+# integrity classes, unknown column, bad body), worth splitting a chunk to
+# isolate them
+ROW_ERROR_CODES = ("21", "22", "23", "42703", "PGRST102", "PGRST204")
+# Natural key jobs are upserted on, so re-crawled postings replace themselves
+JOBS_CONFLICT_KEY = "application_url"
+
+# Paginated reads from Supabase: rows per page, ids per `in` filter
+READ_PAGE_SIZE = 1_000
+READ_MAX_IDS = 200
+
+# Local SQLite storage and its refresh interval when replicating Supabase
+LOCAL_STORAGE_PATH = ".cache/storage.sqlite3"
+LOCAL_CACHE_MAX_AGE = 3_600
+# Bound on `?` placeholders in one SQLite statement
+SQLITE_MAX_VARIABLES = 900
+
+# Per-URL validators, text hashes and extractions from previous crawls
+CRAWL_STATE_PATH = ".cache/crawl_state.sqlite3"
+
+# Near-duplicate postings: SimHash index and max differing bits (below 4)
+DEDUP_INDEX_PATH = ".cache/dedup.sqlite3"
+DEDUP_MAX_DISTANCE = 3
+# Word 3-shingles a posting needs to be fingerprinted at all
+DEDUP_MIN_SHINGLES = 30
+
+# Resume pages read; anything past them is ignored
+RESUME_MAX_PAGES = 2
+
+# Bulk resume ingestion: parsing processes, resumes in flight, seconds per PDF
+RESUME_MAX_WORKERS = 4
+RESUME_MAX_PENDING = 32
+RESUME_PARSE_TIMEOUT = 30
+
+# Instrumentation histogram buckets: stage seconds, tokens per LLM call,
+# retries per extraction
+METRICS_SECONDS_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRICS_TOKEN_BUCKETS = (128, 256, 512, 1_024, 2_048, 4_096, 8_192, 16_384, 32_768)
+METRICS_RETRY_BUCKETS = (0, 1, 2, 3, 5)